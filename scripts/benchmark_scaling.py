@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+TRACKING_INPUT = "{data}/tracking/IDTPM.C000.ttbar_pu200_EFsel.HIST.root"
+TRACKING_INPUTS = [
+    "--input-acts-fast",
+    "{data}/tracking/IDTPM_TTBAR_Acts_C100_digital_Main30July2025.root",
+    "--input-acts-slow",
+    "{data}/tracking/IDTPM_TTBAR_Acts_C100DEFAULT_digital.root",
+]
+# mirrors the rules of the Snakefile
+PLOTS = {
+    "clustering_pixel": [
+        "plot_clustering.py",
+        "{data}/clustering/acts-expert-monitoring.root",
+        "pixelalg",
+    ],
+    "clustering_strip": [
+        "plot_clustering.py",
+        "{data}/clustering/acts-expert-monitoring.root",
+        "stripalg",
+    ],
+    "spot": ["plot_spot.py", "{data}/spot"],
+    # the CPU models default to the table of the repository
+    "spot_capacity": ["plot_spot_capacity.py", "{data}/spot"],
+    "seeding_pixel": ["plot_seeding.py", "{data}/spot", "pixel"],
+    **{
+        f"tracking_efficiency_{mode}": [
+            "plot_tracking_efficiency.py",
+            TRACKING_INPUT,
+            mode,
+        ]
+        + TRACKING_INPUTS
+        for mode in ["physics", "technical"]
+    },
+    **{
+        f"tracking_resolution_{mode}": [
+            "plot_tracking_resolution.py",
+            TRACKING_INPUT,
+            mode,
+        ]
+        + TRACKING_INPUTS
+        for mode in ["d0", "z0", "ptqopt"]
+    },
+    **{
+        f"tracking_hits_{mode}": ["plot_tracking_hits.py", TRACKING_INPUT, mode]
+        + TRACKING_INPUTS
+        for mode in ["pixel_inner", "pixel", "strip"]
+    },
+}
+
+
+def measure(command):
+    """
+    Run a command and return its wall time in seconds and peak resident memory
+    in MB.
+
+    The kernel carries the peak memory of the parent over into children, so
+    this process must stay small: the inputs are generated in a subprocess and
+    pandas and matplotlib are only imported once all plots are measured.
+    """
+    start = time.perf_counter()
+    process = subprocess.Popen(command, stdout=subprocess.DEVNULL)
+    _, status, usage = os.wait4(process.pid, 0)
+    elapsed = time.perf_counter() - start
+    returncode = os.waitstatus_to_exitcode(status)
+    if returncode != 0:
+        raise subprocess.CalledProcessError(returncode, command)
+    # ru_maxrss is in kB on Linux and in bytes on macOS
+    rss = usage.ru_maxrss / (1024**2 if sys.platform == "darwin" else 1024)
+    return elapsed, rss
+
+
+def run(work_dir, scales, plots, repeat=1, regenerate=False):
+    records = []
+    for scale in scales:
+        data = Path(work_dir) / f"scale_{scale:g}"
+        if regenerate or not data.exists():
+            start = time.perf_counter()
+            subprocess.run(
+                [
+                    sys.executable,
+                    str(SCRIPTS_DIR / "synthetic.py"),
+                    str(data),
+                    "--scale",
+                    str(scale),
+                ],
+                check=True,
+            )
+            print(f"generated scale {scale:g} in {time.perf_counter() - start:.1f}s")
+
+        for name in plots:
+            script, *arguments = PLOTS[name]
+            output = data / "plots" / f"{name}.png"
+            output.parent.mkdir(exist_ok=True)
+            command = [
+                sys.executable,
+                str(SCRIPTS_DIR / script),
+                *(argument.format(data=data) for argument in arguments),
+                "--output",
+                str(output),
+            ]
+            for _ in range(repeat):
+                elapsed, rss = measure(command)
+                records.append(
+                    {"plot": name, "scale": scale, "time_s": elapsed, "rss_mb": rss}
+                )
+                print(f"{name} x{scale:g}: {elapsed:.2f}s {rss:.0f}MB", flush=True)
+
+    return records
+
+
+def plot_curves(summary, output):
+    import matplotlib.pyplot as plt
+
+    fig, axs = plt.subplots(1, 2, figsize=(10, 4), layout="constrained")
+    for name, group in summary.groupby("plot"):
+        axs[0].plot(group["scale"], group["time_s"], marker="o", label=name)
+        axs[1].plot(group["scale"], group["rss_mb"], marker="o", label=name)
+    for ax, ylabel in zip(axs, ["Wall time [s]", "Peak memory [MB]"]):
+        ax.set_xscale("log")
+        ax.set_yscale("log")
+        ax.set_xlabel("Input size relative to scale 1")
+        ax.set_ylabel(ylabel)
+    axs[1].legend(fontsize=6, ncols=2)
+    fig.savefig(output)
+    plt.close(fig)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "work_dir", type=Path, help="Folder for the synthetic inputs and plots"
+    )
+    parser.add_argument(
+        "--scale",
+        type=float,
+        action="append",
+        help="Input size, repeat for several, default 1, 10 and 100",
+    )
+    parser.add_argument(
+        "--plot",
+        action="append",
+        choices=list(PLOTS),
+        help="Plot to benchmark, repeat for several, default all",
+    )
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument(
+        "--regenerate", action="store_true", help="Write the inputs again"
+    )
+    parser.add_argument("--output", type=Path, help="Path to output CSV file")
+    parser.add_argument("--curves", type=Path, help="Path to output plot of curves")
+    args = parser.parse_args()
+
+    records = run(
+        args.work_dir,
+        args.scale or [1, 10, 100],
+        args.plot or list(PLOTS),
+        args.repeat,
+        args.regenerate,
+    )
+    import pandas as pd
+
+    results = pd.DataFrame.from_records(records)
+    # the fastest repetition is the least disturbed by the rest of the system
+    summary = results.groupby(["plot", "scale"], as_index=False).min()
+
+    table = summary.pivot(index="plot", columns="scale", values=["time_s", "rss_mb"])
+    with pd.option_context(
+        "display.width", 200, "display.float_format", "{:.2f}".format
+    ):
+        print(table.to_string())
+
+    if args.output is not None:
+        results.to_csv(args.output, index=False)
+    if args.curves is not None:
+        plot_curves(summary, args.curves)
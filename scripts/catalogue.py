@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+
+import argparse
+import difflib
+import fnmatch
+import hashlib
+import json
+import re
+from pathlib import Path
+import numpy as np
+
+
+CATALOGUE_VERSION = 1
+CACHE_DIR = Path.home() / ".cache" / "idtpm-catalogue"
+
+
+def catalogue_path(path, cache_dir=CACHE_DIR):
+    path = Path(path).resolve()
+    digest = hashlib.sha1(path.as_posix().encode()).hexdigest()[:16]
+    return Path(cache_dir) / f"{path.stem}.{digest}.json"
+
+
+def _binning(obj, classname):
+    if classname == "TEfficiency":
+        obj = obj.member("fTotalHistogram")
+    edges = [axis.edges(flow=False) for axis in obj.axes]
+    return [
+        {
+            "nbins": len(e) - 1,
+            "low": float(e[0]),
+            "high": float(e[-1]),
+            "uniform": bool(len(e) < 3 or np.ptp(np.diff(e)) < 1e-9 * (e[-1] - e[0])),
+        }
+        for e in edges
+    ]
+
+
+def build(path):
+    """
+    Walk the directory tree of a ROOT file once and record the class and, for
+    histograms, the binning of every object.
+    """
+    import uproot
+
+    path = Path(path)
+    objects = {}
+    with uproot.open(path) as file:
+        for key, classname in file.classnames().items():
+            key = key.rsplit(";", 1)[0]
+            entry = {"class": classname}
+            if classname.startswith(("TH1", "TH2", "TH3", "TProfile")) or (
+                classname == "TEfficiency"
+            ):
+                try:
+                    entry["axes"] = _binning(file[key], classname)
+                except Exception as e:
+                    entry["error"] = str(e)
+            objects[key] = entry
+
+    stat = path.stat()
+    return {
+        "version": CATALOGUE_VERSION,
+        "file": path.resolve().as_posix(),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "objects": objects,
+    }
+
+
+def load(path, cache_dir=CACHE_DIR, rebuild=False):
+    """
+    Return the catalogue of a ROOT file, building and persisting it if there is
+    no up to date one in `cache_dir`.
+    """
+    path = Path(path)
+    cache = catalogue_path(path, cache_dir)
+    stat = path.stat()
+
+    if cache.exists() and not rebuild:
+        catalogue = json.loads(cache.read_text())
+        if (
+            catalogue.get("version") == CATALOGUE_VERSION
+            and catalogue.get("size") == stat.st_size
+            and catalogue.get("mtime_ns") == stat.st_mtime_ns
+        ):
+            return catalogue
+
+    catalogue = build(path)
+    cache.parent.mkdir(parents=True, exist_ok=True)
+    tmp = cache.with_name(cache.name + ".tmp")
+    tmp.write_text(json.dumps(catalogue, separators=(",", ":")))
+    tmp.replace(cache)
+    return catalogue
+
+
+def find(catalogues, pattern, regex=False, classname=None):
+    """
+    Find objects matching a glob pattern, or a regular expression if `regex`
+    is set, across several catalogues.
+
+    Returns:
+    list of (str, str, dict): File, object path and catalogue entry.
+    """
+    if regex:
+        match = re.compile(pattern).search
+    else:
+        match = re.compile(fnmatch.translate(pattern)).match
+
+    return [
+        (catalogue["file"], key, entry)
+        for catalogue in catalogues
+        for key, entry in catalogue["objects"].items()
+        if match(key) and (classname is None or entry["class"].startswith(classname))
+    ]
+
+
+def suggest(catalogue, path, n=5):
+    return difflib.get_close_matches(path, catalogue["objects"].keys(), n=n)
+
+
+def resolve(catalogue, path):
+    """
+    Check that an object exists and return its entry, with close matches in the
+    error message otherwise.
+    """
+    entry = catalogue["objects"].get(path)
+    if entry is None:
+        matches = "\n".join(f"  {match}" for match in suggest(catalogue, path))
+        raise KeyError(
+            f"{path} not found in {catalogue['file']}"
+            + (f", did you mean:\n{matches}" if matches else "")
+        )
+    return entry
+
+
+def format_entry(entry):
+    axes = " x ".join(
+        f"{axis['nbins']}[{axis['low']:g},{axis['high']:g}]"
+        + ("" if axis["uniform"] else "~")
+        for axis in entry.get("axes", [])
+    )
+    return f"{entry['class']} {axes}".strip()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("inputs", type=Path, nargs="+", help="ROOT files to index")
+    parser.add_argument("--glob", help="Glob pattern to look up")
+    parser.add_argument("--regex", help="Regular expression to look up")
+    parser.add_argument("--class", dest="classname", help="Only objects of this class")
+    parser.add_argument("--cache-dir", type=Path, default=CACHE_DIR)
+    parser.add_argument("--rebuild", action="store_true", help="Ignore cached indices")
+    args = parser.parse_args()
+
+    catalogues = [load(path, args.cache_dir, args.rebuild) for path in args.inputs]
+
+    if args.glob is None and args.regex is None:
+        for catalogue in catalogues:
+            print(catalogue["file"], len(catalogue["objects"]), "objects")
+    else:
+        pattern = args.regex if args.regex is not None else args.glob
+        results = find(catalogues, pattern, args.regex is not None, args.classname)
+        for file, key, entry in results:
+            print(f"{file}:{key}  {format_entry(entry)}")
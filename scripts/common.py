@@ -1,11 +1,36 @@
 import numpy as np
 import scipy.stats
+import functools
+import hashlib
+import inspect
 import math
+import os
+from collections import OrderedDict
+from pathlib import Path
 import matplotlib.pyplot as plt
 
 
-markers = ["o", "^", "s", "D"]
-colors = ["C0", "C1", "C2", "C3"]
+markers = ["o", "^", "s", "D", "v", "<", ">", "p", "h", "X", "P", "*"]
+colors = [f"C{i}" for i in range(10)]
+
+
+def palette(n):
+    """
+    Return `n` (marker, color) pairs. The first ones match `markers` and
+    `colors`, beyond that colors and markers cycle independently so pairs only
+    repeat after 60 entries.
+    """
+    return [(markers[i % len(markers)], colors[i % len(colors)]) for i in range(n)]
+
+
+def labelled_input(spec):
+    """
+    Parse a `LABEL=PATH` command line argument.
+    """
+    label, sep, path = spec.partition("=")
+    if not sep or not label or not path:
+        raise ValueError(f"Expected LABEL=PATH, got: {spec}")
+    return label, Path(path)
 
 
 def apply_style():
@@ -22,6 +47,206 @@ def apply_style():
     plt.rc("figure", titlesize=BIGGER_SIZE)  # fontsize of the figure title
 
 
+def read_object(path, key):
+    """
+    Read a single object with uproot. Fails with the closest existing paths if
+    the object does not exist. Trees are read into an awkward array, they
+    cannot be read once the file is closed.
+    """
+    import uproot
+
+    with uproot.open(path) as file:
+        try:
+            obj = file[key]
+        except KeyError:
+            from catalogue import load, resolve
+
+            resolve(load(path), key)
+            raise
+        if hasattr(obj, "arrays"):
+            return obj.arrays(library="ak")
+        return obj
+
+
+def load_objects(paths, key, workers=None):
+    """
+    Open all files and read `key` from each of them concurrently. uproot
+    releases the GIL while decompressing, so the total time is close to the one
+    of the slowest file.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(max_workers=workers or len(paths) or 1) as executor:
+        return list(executor.map(read_object, paths, [key] * len(paths)))
+
+
+def load_histograms(paths, key, xrange=None, workers=None):
+    return [
+        TH1.from_uproot(obj, xrange=xrange)
+        for obj in load_objects(paths, key, workers=workers)
+    ]
+
+
+def stream_passed_total(
+    path, tree, variable, passed, edges, selection=None, step_size="200 MB"
+):
+    """
+    Histogram passed and total counts of `variable` in `edges` from a tree of
+    per-truth-particle flags, reading it in chunks of `step_size` so memory
+    stays flat however many entries there are. Per-event branches like the
+    pile-up are broadcast to the particles of the event.
+
+    Parameters:
+    path (str): ROOT file, may contain wildcards to read several files.
+    tree (str): Path of the tree inside the file.
+    variable (str): Branch to histogram.
+    passed (str): Branch flagging matched truth particles.
+    edges (array): Bin edges.
+    selection (str): Optional branch flagging the particles to count.
+
+    Returns:
+    (array, array): Passed and total counts per bin.
+    """
+    import awkward as ak
+    import uproot
+
+    branches = [variable, passed] + ([selection] if selection else [])
+    n_passed = np.zeros(len(edges) - 1)
+    n_total = np.zeros(len(edges) - 1)
+    for arrays in uproot.iterate(
+        {str(path): tree}, branches, step_size=step_size, library="ak"
+    ):
+        columns = ak.broadcast_arrays(*(arrays[branch] for branch in branches))
+        x, flag, *rest = (
+            ak.to_numpy(ak.flatten(column, axis=None)) for column in columns
+        )
+        if rest:
+            keep = rest[0].astype(bool)
+            x, flag = x[keep], flag[keep]
+        n_total += np.histogram(x, bins=edges)[0]
+        n_passed += np.histogram(x[flag.astype(bool)], bins=edges)[0]
+    return n_passed, n_total
+
+
+def pair_events(keys_a, keys_b):
+    """
+    Indices of the entries of two trees belonging to the same events, found by
+    a sort-merge join on their event keys. Keys appearing more than once on
+    one side are ambiguous and dropped.
+
+    Parameters:
+    keys_a (array): Event key of every entry of the first tree, e.g. the event
+        number or the entry index.
+    keys_b (array): Event key of every entry of the second tree.
+
+    Returns:
+    (array, array): Entries of the first and second tree, ordered by key.
+    """
+
+    def unique_entries(keys):
+        keys, index, counts = np.unique(
+            np.asarray(keys), return_index=True, return_counts=True
+        )
+        return keys[counts == 1], index[counts == 1]
+
+    keys_a, index_a = unique_entries(keys_a)
+    keys_b, index_b = unique_entries(keys_b)
+    _, a, b = np.intersect1d(keys_a, keys_b, assume_unique=True, return_indices=True)
+    return index_a[a], index_b[b]
+
+
+class FitCache:
+    """
+    Results of fits keyed by a digest of their input, held in an in-process
+    LRU of `maxsize` entries and, if `directory` is set, in one small file per
+    result on disk which is shared between runs.
+    """
+
+    def __init__(self, maxsize=4096, directory=None):
+        self.maxsize = maxsize
+        self.directory = None if directory is None else Path(directory)
+        self.entries = OrderedDict()
+        self.hits = self.disk_hits = self.misses = 0
+
+    def get(self, key):
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return self.entries[key]
+        if self.directory is not None:
+            path = self.directory / key[:2] / f"{key}.npy"
+            try:
+                value = np.load(path)
+            except (OSError, ValueError):
+                pass
+            else:
+                self.disk_hits += 1
+                self._remember(key, value)
+                return value
+        self.misses += 1
+        return None
+
+    def put(self, key, value):
+        self._remember(key, value)
+        if self.directory is not None:
+            path = self.directory / key[:2] / f"{key}.npy"
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(f"{path.stem}.{os.getpid()}.tmp.npy")
+            np.save(tmp, value)
+            tmp.replace(path)
+
+    def _remember(self, key, value):
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
+
+
+# set ROBUST_FIT_CACHE to a folder to keep fits between runs
+fit_cache = FitCache(directory=os.environ.get("ROBUST_FIT_CACHE") or None)
+
+
+def array_digest(data):
+    """
+    Fast digest of the dtype, shape and content of an array.
+    """
+    data = np.ascontiguousarray(data)
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(f"{data.dtype.str}{data.shape}".encode())
+    digest.update(data.view(np.uint8).ravel() if data.size else b"")
+    return digest.hexdigest()
+
+
+def memoized_fit(func):
+    """
+    Cache the `(m, s), cov` result of a fit of one array in `fit_cache`. The
+    key covers the data, the keyword options, the source of the fit and the
+    scipy version, so edits to the fit do not reuse stale results.
+    """
+    version = hashlib.blake2b(
+        (inspect.getsource(func) + scipy.__version__).encode(), digest_size=8
+    ).hexdigest()
+
+    @functools.wraps(func)
+    def wrapper(data, **options):
+        key = hashlib.blake2b(
+            f"{func.__name__}:{version}:{sorted(options.items())}:".encode()
+            + array_digest(data).encode(),
+            digest_size=20,
+        ).hexdigest()
+        value = fit_cache.get(key)
+        if value is None:
+            (m, s), cov = func(data, **options)
+            value = np.concatenate([[m, s], np.ravel(cov)]).astype(float)
+            fit_cache.put(key, value)
+        return (value[0], value[1]), value[2:].reshape(2, 2).copy()
+
+    return wrapper
+
+
 def robust_mean(data):
     (m, s), cov = robust_gauss_fit(data)
     return m
@@ -37,6 +262,14 @@ def robust_std_std(data):
     return cov[1, 1] ** 0.5
 
 
+def binned_robust_mean_std(x, y, bin_edges):
+    mean, _, _ = scipy.stats.binned_statistic(
+        x, y, bins=bin_edges, statistic=robust_mean
+    )
+    std, _, _ = scipy.stats.binned_statistic(x, y, bins=bin_edges, statistic=robust_std)
+    return mean, std
+
+
 def robust_gauss_fit_naive(data):
     def fit(data):
         return np.mean(data), np.std(data)
@@ -51,6 +284,7 @@ def robust_gauss_fit_naive(data):
     return (m, s), np.zeros((2, 2))
 
 
+@memoized_fit
 def robust_gauss_fit(data):
     def fit(data):
         try:
@@ -87,7 +321,323 @@ def robust_gauss_fit(data):
     return (m, s), cov
 
 
+def _batched_solve(a, b):
+    """
+    Solve a stack of linear systems. If one of them is singular, e.g. a fit
+    collapsed onto a single bin, all are solved with the pseudo-inverse
+    instead, which gives the least squares solution of every system.
+    """
+    try:
+        return np.linalg.solve(a, b[..., None])[..., 0]
+    except np.linalg.LinAlgError:
+        return np.einsum("sij,sj->si", np.linalg.pinv(a), b)
+
+
+def robust_gauss_fit_binned(edges, counts, min_entries=20, steps=10):
+    """
+    Batched version of `robust_gauss_fit` working on binned contents.
+
+    Every slice along the last axis of `counts` is fitted independently and all
+    slices are fitted at once. The start values come from a parabola fit to the
+    logarithm of the bin contents, which is linear. They are refined with
+    Gauss-Newton steps of the same unweighted least squares `curve_fit` solves.
+    Like `robust_gauss_fit` the fit is iterated three times within +-3 sigma and
+    falls back to the mean/std for slices with fewer than `min_entries` entries
+    or a failed fit.
+
+    Parameters:
+    edges (array): Bin edges of the last axis of `counts`.
+    counts (array): Bin contents with shape (..., len(edges) - 1).
+    min_entries (int): Minimum number of entries to attempt a fit.
+    steps (int): Number of Gauss-Newton steps per iteration.
+
+    Returns:
+    ((array, array), array): Mean and sigma with shape (...) and their
+    covariance with shape (..., 2, 2).
+    """
+    edges = np.asarray(edges, dtype=float)
+    counts = np.asarray(counts, dtype=float)
+    shape = counts.shape[:-1]
+    counts = np.clip(counts.reshape(-1, counts.shape[-1]), 0, None)
+    centers = 0.5 * (edges[1:] + edges[:-1])
+
+    def gauss_jacobian(a, m, s):
+        z = (centers - m[:, None]) / s[:, None]
+        f = a[:, None] * np.exp(-0.5 * z**2)
+        jacobian = np.stack(
+            [f / a[:, None], f * z / s[:, None], f * z**2 / s[:, None]], axis=-1
+        )
+        return f, jacobian
+
+    def fit_window(center, half_width):
+        # at least one bin on each side, a slice within one bin has no width
+        half_width = np.maximum(half_width, np.max(np.diff(edges)))
+        return np.abs(centers - center[:, None]) <= half_width[:, None]
+
+    def moments(weights):
+        n = weights.sum(axis=-1)
+        m = (weights * centers).sum(axis=-1) / n
+        s = np.sqrt((weights * (centers - m[:, None]) ** 2).sum(axis=-1) / n)
+        return n, m, s
+
+    # start from the median and the central 68% interval to be robust to tails
+    cdf = np.cumsum(counts, axis=-1)
+    q16, q50, q84 = (
+        centers[np.minimum((cdf < q * cdf[:, -1:]).sum(axis=-1), len(centers) - 1)]
+        for q in (0.16, 0.5, 0.84)
+    )
+    window = fit_window(q50, 1.5 * (q84 - q16))
+
+    # diverging slices are rejected below, their warnings are expected
+    with np.errstate(over="ignore", invalid="ignore", divide="ignore"):
+        for _ in range(3):
+            weights = np.where(window, counts, 0)
+            n, m, s = moments(weights)
+            # without entries in the window fall back to the whole slice
+            empty = n <= 0
+            if empty.any():
+                _, m[empty], s[empty] = (x[empty] for x in moments(counts))
+            m, s = np.nan_to_num(m), np.nan_to_num(s)
+            cov = np.zeros((len(counts), 2, 2))
+
+            valid = (n >= min_entries) & ((weights > 0).sum(axis=-1) >= 4) & (s > 0)
+            index = np.flatnonzero(valid)
+            if len(index) > 0:
+                y, mask = weights[index], window[index].astype(float)
+
+                # parabola in log(y) with Poisson weights, standardized per slice
+                z = (centers - m[index, None]) / s[index, None]
+                design = np.stack([np.ones_like(z), z, z**2], axis=-1)
+                normal = np.einsum("sbi,sb,sbj->sij", design, y, design)
+                rhs = np.einsum("sbi,sb,sb->si", design, y, np.log(np.maximum(y, 1)))
+                p0, p1, p2 = _batched_solve(normal + 1e-9 * np.eye(3), rhs).T
+                ok = p2 < 0
+                a_fit = np.where(
+                    ok, np.exp(p0 - 0.25 * p1**2 / np.where(ok, p2, -1)), 1
+                )
+                a_fit = np.where(ok, a_fit, y.max(axis=-1))
+                m_fit = np.where(
+                    ok, m[index] - 0.5 * s[index] * p1 / np.where(ok, p2, -1), m[index]
+                )
+                s_fit = np.where(
+                    ok, s[index] * np.sqrt(-0.5 / np.where(ok, p2, -1)), s[index]
+                )
+                params = np.stack([a_fit, m_fit, s_fit], axis=-1)
+
+                for _ in range(steps):
+                    f, jacobian = gauss_jacobian(*params.T)
+                    jacobian = jacobian * mask[..., None]
+                    normal = np.einsum("sbi,sbj->sij", jacobian, jacobian)
+                    rhs = np.einsum("sbi,sb->si", jacobian, (y - f) * mask)
+                    delta = _batched_solve(normal + 1e-12 * np.eye(3), rhs)
+                    params = params + np.nan_to_num(delta)
+
+                f, jacobian = gauss_jacobian(*params.T)
+                jacobian = jacobian * mask[..., None]
+                normal = np.einsum("sbi,sbj->sij", jacobian, jacobian)
+                dof = np.maximum(mask.sum(axis=-1) - 3, 1)
+                chi2 = (((y - f) * mask) ** 2).sum(axis=-1)
+                # sparse slices can diverge, keep fits close to the window moments
+                ok = (
+                    np.isfinite(params).all(axis=-1)
+                    & (params[:, 2] > 0)
+                    & (params[:, 2] < 3 * s[index])
+                    & (np.abs(params[:, 1] - m[index]) < 3 * s[index])
+                    & (np.abs(np.linalg.det(normal)) > 0)
+                )
+                index, params = index[ok], params[ok]
+                fit_cov = (
+                    np.linalg.inv(normal[ok]) * (chi2[ok] / dof[ok])[:, None, None]
+                )
+                m[index], s[index] = params[:, 1], params[:, 2]
+                cov[index] = fit_cov[:, 1:, 1:]
+
+            window = fit_window(m, 3 * s)
+
+    return (m.reshape(shape), s.reshape(shape)), cov.reshape(shape + (2, 2))
+
+
+def bootstrap_binning(data):
+    """
+    Fixed binning for the resamples of `data`: +-8 sigma around the median,
+    estimated from the central 68%, with about as fine bins as
+    `robust_gauss_fit` uses and at least unit width for integer data.
+    """
+    q16, q50, q84 = np.quantile(data, [0.16, 0.5, 0.84])
+    half_width = 8 * max(0.5 * (q84 - q16), 1e-12)
+    width = 2 * half_width / np.clip(int(3 * math.sqrt(len(data))), 30, 1000)
+    if np.all(data == np.round(data)):
+        width = max(round(width), 1)
+        q50 = round(q50) + 0.5
+    n = int(math.ceil(half_width / width))
+    return q50 + width * np.arange(-n, n + 1)
+
+
+def _bootstrap_counts(bins, n_bins, n_resamples, seed, multinomial):
+    """
+    Histograms of `n_resamples` resamples of the entries in `bins`, an array of
+    bin indices where `n_bins` marks entries outside the binning.
+
+    The resamples are drawn as a batched index matrix, a chunk of rows at a
+    time. With `multinomial` drawing every index is replaced by one multinomial
+    draw per resample from the observed bin frequencies, which has the same
+    distribution and a cost independent of the number of entries.
+    """
+    rng = np.random.default_rng(seed)
+    n = len(bins)
+
+    if multinomial:
+        p = np.bincount(bins, minlength=n_bins + 1) / n
+        return rng.multinomial(n, p, size=n_resamples)[:, :n_bins]
+
+    rows = max(1, (1 << 22) // n)
+    counts = []
+    for start in range(0, n_resamples, rows):
+        size = min(rows, n_resamples - start)
+        index = rng.integers(0, n, size=(size, n))
+        offset = np.arange(size)[:, None] * (n_bins + 1)
+        flat = np.bincount(
+            (bins[index] + offset).ravel(), minlength=size * (n_bins + 1)
+        )
+        counts.append(flat.reshape(size, n_bins + 1)[:, :n_bins])
+    return np.concatenate(counts)
+
+
+def _seed_sequence(seed):
+    if isinstance(seed, np.random.SeedSequence):
+        return seed
+    return np.random.SeedSequence(seed)
+
+
+def bootstrap_robust_gauss_fit(
+    data,
+    n_resamples=200,
+    seed=0,
+    workers=None,
+    max_matrix_entries=1 << 25,
+):
+    """
+    Bootstrap distribution of the robust mean and sigma of `data`.
+
+    All resamples are binned with the same `bootstrap_binning` and fitted at
+    once with `robust_gauss_fit_binned`. With `workers` the resamples are split
+    into chunks of 16 which are drawn in a process pool. Every chunk has its
+    own seed spawned from `seed`, so the result does not depend on the number
+    of workers.
+
+    Returns:
+    (array, array): Mean and sigma of every resample.
+    """
+    data = np.asarray(data, dtype=float)
+    if len(data) == 0:
+        return np.zeros(n_resamples), np.zeros(n_resamples)
+
+    edges = bootstrap_binning(data)
+    n_bins = len(edges) - 1
+    bins = np.searchsorted(edges, data, side="right") - 1
+    bins[(bins < 0) | (bins >= n_bins)] = n_bins
+
+    # fixed chunks so the drawn resamples do not depend on `workers`
+    n_chunks = -(-n_resamples // 16)
+    sizes = [len(c) for c in np.array_split(np.arange(n_resamples), n_chunks)]
+    seeds = _seed_sequence(seed).spawn(n_chunks)
+    arguments = (
+        [bins] * n_chunks,
+        [n_bins] * n_chunks,
+        sizes,
+        seeds,
+        [len(data) * n_resamples > max_matrix_entries] * n_chunks,
+    )
+
+    if workers is not None and n_chunks > 1 and len(data) * n_resamples > 1 << 22:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            counts = list(executor.map(_bootstrap_counts, *arguments))
+    else:
+        counts = list(map(_bootstrap_counts, *arguments))
+
+    (m, s), _ = robust_gauss_fit_binned(edges, np.concatenate(counts))
+    return m, s
+
+
+def binned_bootstrap_robust_gauss_fit(x, y, bin_edges, n_resamples=200, seed=0):
+    """
+    `bootstrap_robust_gauss_fit` of `y` in bins of `x`, every bin with its own
+    seed spawned from `seed`.
+
+    Returns:
+    (array, array): Mean and sigma with shape (bin, resample).
+    """
+    x, y = np.asarray(x), np.asarray(y)
+    index = np.digitize(x, bin_edges) - 1
+    seeds = _seed_sequence(seed).spawn(len(bin_edges) - 1)
+    m, s = zip(
+        *(
+            bootstrap_robust_gauss_fit(y[index == i], n_resamples, seeds[i])
+            for i in range(len(bin_edges) - 1)
+        )
+    )
+    return np.array(m), np.array(s)
+
+
+def bootstrap_interval(samples, cl=0.682689492137):
+    """
+    Central percentile interval of bootstrap samples along the last axis.
+
+    Returns:
+    (array, array): Lower and upper bound.
+    """
+    alpha = 1 - cl
+    return tuple(np.quantile(samples, [alpha / 2, 1 - alpha / 2], axis=-1))
+
+
+def bootstrap_ratio_interval(samples_x, samples_y, cl=0.682689492137):
+    """
+    Interval of the ratio x/y of two independent bootstrap distributions, e.g.
+    of the robust means of two samples.
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return bootstrap_interval(samples_x / samples_y, cl)
+
+
+def th2_to_numpy(th2):
+    """
+    Return the contents of a TH2 without under- and overflow together with the
+    x and y bin edges. Works for both uproot and PyROOT histograms.
+    """
+    if hasattr(th2, "to_numpy"):
+        return th2.to_numpy(flow=False)
+
+    x_axis, y_axis = th2.GetXaxis(), th2.GetYaxis()
+    nx, ny = th2.GetNbinsX(), th2.GetNbinsY()
+    x_edges = np.array([x_axis.GetBinLowEdge(i) for i in range(1, nx + 2)])
+    y_edges = np.array([y_axis.GetBinLowEdge(i) for i in range(1, ny + 2)])
+    counts = np.array(
+        [[th2.GetBinContent(i, j) for j in range(1, ny + 1)] for i in range(1, nx + 1)]
+    )
+    return counts, x_edges, y_edges
+
+
+def resolution_from_th2(th2, xrange=None, scale=1):
+    """
+    Extract the resolution vs x from a 2D residual vs x histogram by fitting
+    every x slice with `robust_gauss_fit_binned`.
+    """
+    counts, x_edges, y_edges = th2_to_numpy(th2)
+    (_, s), cov = robust_gauss_fit_binned(y_edges, counts)
+    hist = TH1.from_arrays(x_edges, scale * s, scale * cov[:, 1, 1] ** 0.5)
+    return hist if xrange is None else hist.xrange(*xrange)
+
+
 class TH1:
+    """
+    1D histogram stored as bin edges, values and asymmetric errors. Centers,
+    widths and x errors are derived from the edges on access.
+    """
+
+    __slots__ = ("edges", "y", "y_err_lo", "y_err_hi")
+
     def __init__(self, th1_tefficiency, xrange=None):
         try:
             th1 = th1_tefficiency.GetTotalHistogram()
@@ -103,13 +653,10 @@ class TH1:
                 if th1.GetBinCenter(i) >= xrange[0] and th1.GetBinCenter(i) <= xrange[1]
             ]
 
-        self.x = np.array([th1.GetBinCenter(i) for i in bins])
-
-        self.x_lo = np.array([th1.GetBinLowEdge(i) for i in bins])
-        self.x_width = np.array([th1.GetBinWidth(i) for i in bins])
-        self.x_hi = np.add(self.x_lo, self.x_width)
-        self.x_err_lo = np.subtract(self.x, self.x_lo)
-        self.x_err_hi = np.subtract(self.x_hi, self.x)
+        self.edges = np.array(
+            [th1.GetBinLowEdge(i) for i in bins]
+            + [th1.GetBinLowEdge(bins[-1]) + th1.GetBinWidth(bins[-1])]
+        )
 
         try:
             self.y = np.array([th1_tefficiency.GetEfficiency(i) for i in bins])
@@ -124,6 +671,218 @@ class TH1:
             self.y_err_lo = np.array([th1_tefficiency.GetBinError(i) for i in bins])
             self.y_err_hi = np.array([th1_tefficiency.GetBinError(i) for i in bins])
 
+    @classmethod
+    def from_uproot(cls, obj, xrange=None):
+        """
+        Build from an uproot TH1, TProfile or TEfficiency. Efficiency errors are
+        the frequentist intervals and confidence level stored in the
+        TEfficiency, 68.3% Clopper-Pearson by default. Bayesian intervals and
+        weights are not supported.
+        """
+        if obj.classname == "TEfficiency":
+            option = obj.member("fStatisticOption")
+            if option not in EFFICIENCY_STATISTICS or obj.member("@fBits") & (
+                TEFFICIENCY_BAYESIAN | TEFFICIENCY_WEIGHTS
+            ):
+                raise ValueError(
+                    f"Unsupported statistic option {option} or bits "
+                    f"{obj.member('@fBits'):#x} of TEfficiency {obj.member('fName')}"
+                )
+            passed = obj.member("fPassedHistogram")
+            total = obj.member("fTotalHistogram")
+            if obj.member("fWeight") != 1 or not np.allclose(
+                total.variances(flow=False), total.values(flow=False)
+            ):
+                raise ValueError(
+                    f"Weighted TEfficiency {obj.member('fName')} is not supported"
+                )
+            edges = total.axis().edges(flow=False)
+            y, y_err_lo, y_err_hi = efficiency_interval(
+                passed.values(flow=False),
+                total.values(flow=False),
+                obj.member("fConfLevel"),
+                EFFICIENCY_STATISTICS[option],
+            )
+        else:
+            edges = obj.axis().edges(flow=False)
+            y = obj.values(flow=False)
+            y_err_lo = y_err_hi = obj.errors(flow=False)
+
+        hist = cls.from_arrays(edges, y, y_err_lo, y_err_hi)
+        if xrange is None:
+            return hist
+        return hist.xrange(*xrange)
+
+    @classmethod
+    def from_arrays(cls, edges, y, y_err_lo, y_err_hi=None):
+        """
+        Build from arrays without copying them. Symmetric errors are stored
+        once and shared by both sides.
+        """
+        self = cls.__new__(cls)
+        self.edges = np.asarray(edges, dtype=float)
+        self.y = np.asarray(y, dtype=float)
+        self.y_err_lo = np.asarray(y_err_lo, dtype=float)
+        self.y_err_hi = (
+            self.y_err_lo if y_err_hi is None else np.asarray(y_err_hi, dtype=float)
+        )
+        return self
+
+    @classmethod
+    def from_efficiency(cls, edges, passed, total):
+        """
+        Build from passed and total counts with Clopper-Pearson intervals.
+        """
+        return cls.from_arrays(edges, *efficiency_interval(passed, total))
+
+    def __len__(self):
+        return len(self.y)
+
+    @property
+    def x_lo(self):
+        return self.edges[:-1]
+
+    @property
+    def x_hi(self):
+        return self.edges[1:]
+
+    @property
+    def x_width(self):
+        return np.diff(self.edges)
+
+    @property
+    def x(self):
+        return 0.5 * (self.edges[:-1] + self.edges[1:])
+
+    @property
+    def x_err_lo(self):
+        return 0.5 * self.x_width
+
+    @property
+    def x_err_hi(self):
+        return 0.5 * self.x_width
+
+    @property
+    def y_err(self):
+        return 0.5 * (self.y_err_lo + self.y_err_hi)
+
+    def same_binning(self, other):
+        return len(self.edges) == len(other.edges) and np.allclose(
+            self.edges, other.edges
+        )
+
+    def _check_binning(self, other):
+        if not self.same_binning(other):
+            raise ValueError("Histograms need the same binning")
+
+    def xrange(self, xmin, xmax):
+        """
+        Bins with centers in [xmin, xmax]. The arrays are views into the ones
+        of this histogram, not copies.
+        """
+        x = self.x
+        keep = np.flatnonzero((x >= xmin) & (x <= xmax))
+        if len(keep) == 0:
+            raise ValueError(f"No bins in [{xmin}, {xmax}]")
+        first, last = keep[0], keep[-1] + 1
+        return TH1.from_arrays(
+            self.edges[first : last + 1],
+            self.y[first:last],
+            self.y_err_lo[first:last],
+            None if self.y_err_hi is self.y_err_lo else self.y_err_hi[first:last],
+        )
+
+    def __add__(self, other):
+        """
+        Bin-wise sum, errors are added in quadrature.
+        """
+        self._check_binning(other)
+        return TH1.from_arrays(
+            self.edges,
+            self.y + other.y,
+            np.hypot(self.y_err_lo, other.y_err_lo),
+            np.hypot(self.y_err_hi, other.y_err_hi),
+        )
+
+    def __mul__(self, factor):
+        scale = np.abs(factor)
+        return TH1.from_arrays(
+            self.edges, self.y * factor, self.y_err_lo * scale, self.y_err_hi * scale
+        )
+
+    __rmul__ = __mul__
+
+    def divide(self, other, min_denominator=None):
+        """
+        Bin-wise ratio to another histogram or a scalar. Errors are propagated
+        with `ratio_std` separately for both sides. Bins where the denominator
+        is below `min_denominator` are set to NaN.
+        """
+        if np.isscalar(other):
+            return self * (1 / other)
+
+        self._check_binning(other)
+        denominator = np.copy(other.y)
+        if min_denominator is not None:
+            denominator[denominator < min_denominator] = float("nan")
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return TH1.from_arrays(
+                self.edges,
+                self.y / denominator,
+                ratio_std(self.y, denominator, self.y_err_lo, other.y_err_lo),
+                ratio_std(self.y, denominator, self.y_err_hi, other.y_err_hi),
+            )
+
+    __truediv__ = divide
+
+    def rebin(self, groups):
+        """
+        Sum adjacent bins, errors in quadrature. `groups` is either the number
+        of bins to merge, dropping the remainder at the upper end, or new bin
+        edges which must be a subset of the current ones.
+        """
+        if np.isscalar(groups):
+            n = (len(self.y) // groups) * groups
+            starts = np.arange(0, n, groups)
+            edges = self.edges[: n + 1 : groups]
+        else:
+            edges = np.asarray(groups, dtype=float)
+            index = np.searchsorted(self.edges, edges)
+            index = np.clip(index, 0, len(self.edges) - 1)
+            if not np.allclose(self.edges[index], edges):
+                raise ValueError("New edges must be a subset of the current ones")
+            starts = index[:-1]
+            n = index[-1]
+
+        def reduce(values):
+            return np.add.reduceat(values[:n], starts)
+
+        y_err_lo = np.sqrt(reduce(self.y_err_lo**2))
+        return TH1.from_arrays(
+            edges,
+            reduce(self.y),
+            y_err_lo,
+            None
+            if self.y_err_hi is self.y_err_lo
+            else np.sqrt(reduce(self.y_err_hi**2)),
+        )
+
+    @staticmethod
+    def merge(hists):
+        """
+        Sum of many histograms with the same binning in one vectorized step,
+        like `hadd`.
+        """
+        reference = hists[0]
+        for hist in hists[1:]:
+            reference._check_binning(hist)
+        return TH1.from_arrays(
+            reference.edges,
+            np.sum([hist.y for hist in hists], axis=0),
+            np.sqrt(np.sum([hist.y_err_lo**2 for hist in hists], axis=0)),
+            np.sqrt(np.sum([hist.y_err_hi**2 for hist in hists], axis=0)),
+        )
+
     def errorbar(self, ax, **errorbar_kwargs):
         ax.errorbar(
             self.x,
@@ -143,6 +902,104 @@ class TH1:
         return ax
 
 
+class TH1Stack:
+    """
+    Histograms with identical binning stacked into (configuration x bin) arrays.
+    """
+
+    def __init__(self, hists):
+        if len(hists) == 0:
+            raise ValueError("Need at least one histogram")
+        reference = hists[0]
+        for hist in hists[1:]:
+            if not reference.same_binning(hist):
+                raise ValueError("All histograms need the same binning")
+
+        self.edges = reference.edges
+        self.x = reference.x
+        self.x_err_lo = reference.x_err_lo
+        self.x_err_hi = reference.x_err_hi
+        self.y = np.stack([hist.y for hist in hists])
+        self.y_err_lo = np.stack([hist.y_err_lo for hist in hists])
+        self.y_err_hi = np.stack([hist.y_err_hi for hist in hists])
+
+    @property
+    def y_err(self):
+        return 0.5 * (self.y_err_lo + self.y_err_hi)
+
+    def ratio(self, reference=0, min_reference=None, symmetrized=False):
+        """
+        Ratio of every configuration to the reference configuration with
+        `TH1.divide`, bins where the reference is below `min_reference` are
+        NaN.
+
+        `TH1.divide` propagates the lower and upper errors as given. The
+        symmetric errors divided here are half the difference of the upper
+        and lower error, the convention of the approved plots which leaves
+        histograms with symmetric errors without ratio errors, or with
+        `symmetrized` the mean of both.
+        """
+        y_err = self.y_err if symmetrized else 0.5 * (self.y_err_hi - self.y_err_lo)
+        hists = [TH1.from_arrays(self.edges, y, err) for y, err in zip(self.y, y_err)]
+        ratios = [hist.divide(hists[reference], min_reference) for hist in hists]
+        return np.stack([r.y for r in ratios]), np.stack([r.y_err_lo for r in ratios])
+
+
+# frequentist TEfficiency::EStatOption values and the TEfficiency status bits
+# of Bayesian intervals and weighted filling
+EFFICIENCY_STATISTICS = {
+    0: "clopper_pearson",
+    1: "normal",
+    2: "wilson",
+    3: "agresti_coull",
+}
+TEFFICIENCY_BAYESIAN = 1 << 14
+TEFFICIENCY_WEIGHTS = 1 << 18
+
+
+def efficiency_interval(passed, total, cl=0.682689492137, statistic="clopper_pearson"):
+    """
+    Efficiencies and their intervals for arrays of passed and total counts,
+    computed like TEfficiency. The default is the TEfficiency default.
+
+    Parameters:
+    passed (array): Passed counts.
+    total (array): Total counts.
+    cl (float): The confidence level.
+    statistic (str): One of the values of `EFFICIENCY_STATISTICS`.
+
+    Returns:
+    (array, array, array): Efficiency and the lower and upper error.
+    """
+    k, n = np.asarray(passed, dtype=float), np.asarray(total, dtype=float)
+    alpha = 1 - cl
+    kappa = scipy.stats.norm.ppf(1 - alpha / 2)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        y = np.where(n > 0, k / n, 0)
+        if statistic == "clopper_pearson":
+            lo = np.where(k > 0, scipy.stats.beta.ppf(alpha / 2, k, n - k + 1), 0)
+            hi = np.where(k < n, scipy.stats.beta.ppf(1 - alpha / 2, k + 1, n - k), 1)
+        else:
+            if statistic == "normal":
+                mode = y
+                delta = kappa * np.sqrt(y * (1 - y) / n)
+            elif statistic == "wilson":
+                mode = (k + 0.5 * kappa**2) / (n + kappa**2)
+                delta = (
+                    kappa
+                    / (n + kappa**2)
+                    * np.sqrt(n * y * (1 - y) + 0.25 * kappa**2)
+                )
+            elif statistic == "agresti_coull":
+                mode = (k + 0.5 * kappa**2) / (n + kappa**2)
+                delta = kappa * np.sqrt(mode * (1 - mode) / (n + kappa**2))
+            else:
+                raise ValueError(f"Unknown efficiency statistic {statistic}")
+            lo = np.where(n > 0, np.clip(mode - delta, 0, 1), 0)
+            hi = np.where(n > 0, np.clip(mode + delta, 0, 1), 1)
+    return y, np.nan_to_num(y - lo), np.nan_to_num(hi - y, nan=1)
+
+
 def ratio_std(x, y, std_x, std_y):
     """
     Calculate the standard deviation of the ratio of two variables x/y.
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import numpy as np
+import pandas as pd
+import scipy.ndimage
+
+
+def find_pairs(reference_folder, plot_folder):
+    """
+    Match every reference PDF with a regenerated plot of the same relative path
+    or, failing that, of the same file name. The approval layout moves some
+    plots into `appendix/` while the Snakefile writes them to `monitoring/`.
+
+    Returns:
+    (list of (Path, Path), list of Path): Matched pairs and references without
+    a regenerated plot.
+    """
+    reference_folder, plot_folder = Path(reference_folder), Path(plot_folder)
+    by_name = {}
+    for path in sorted(plot_folder.rglob("*.pdf"), key=lambda p: len(p.parts)):
+        by_name.setdefault(path.name, path)
+
+    pairs, missing = [], []
+    for reference in sorted(reference_folder.rglob("*.pdf")):
+        plot = plot_folder / reference.relative_to(reference_folder)
+        if not plot.exists():
+            plot = by_name.get(reference.name)
+        if plot is None:
+            missing.append(reference)
+        else:
+            pairs.append((reference, plot))
+    return pairs, missing
+
+
+def rasterize(path, dpi):
+    """
+    Render every page of a PDF to a grayscale image with values in [0, 1].
+    """
+    import pypdfium2
+
+    pdf = pypdfium2.PdfDocument(path)
+    try:
+        pages = []
+        for page in pdf:
+            image = page.render(scale=dpi / 72, grayscale=True).to_numpy()
+            pages.append(image.reshape(image.shape[:2]).astype(np.float32) / 255)
+        return pages
+    finally:
+        pdf.close()
+
+
+def pad(a, b):
+    """
+    Pad two images with white to a common shape.
+    """
+    shape = np.maximum(a.shape, b.shape)
+    return tuple(
+        np.pad(
+            x,
+            [(0, shape[0] - x.shape[0]), (0, shape[1] - x.shape[1])],
+            constant_values=1,
+        )
+        for x in (a, b)
+    )
+
+
+def ssim_map(a, b, window=7):
+    """
+    Structural similarity of two images with values in [0, 1], computed with a
+    uniform window.
+    """
+    c1, c2 = 0.01**2, 0.03**2
+
+    def mean(x):
+        return scipy.ndimage.uniform_filter(x, size=window, mode="reflect")
+
+    mu_a, mu_b = mean(a), mean(b)
+    var_a = mean(a * a) - mu_a**2
+    var_b = mean(b * b) - mu_b**2
+    cov = mean(a * b) - mu_a * mu_b
+    return ((2 * mu_a * mu_b + c1) * (2 * cov + c2)) / (
+        (mu_a**2 + mu_b**2 + c1) * (var_a + var_b + c2)
+    )
+
+
+def diff_image(a, b, changed):
+    """
+    Faded reference with pixels that got darker in red and lighter in blue.
+    """
+    image = np.repeat((0.6 + 0.4 * a)[..., np.newaxis], 3, axis=2)
+    image[changed & (b < a)] = [0.9, 0.1, 0.1]
+    image[changed & (b > a)] = [0.1, 0.3, 0.9]
+    return image
+
+
+def compare(reference, plot, dpi=100, tolerance=0.1, diff_folder=None):
+    """
+    Compare a reference PDF with a regenerated one page by page.
+
+    Returns:
+    dict: Worst metrics over all pages.
+    """
+    pages_a, pages_b = rasterize(reference, dpi), rasterize(plot, dpi)
+    record = {
+        "reference": reference.as_posix(),
+        "plot": plot.as_posix(),
+        "pages": len(pages_a),
+        "size_differs": len(pages_a) != len(pages_b),
+        "mean_abs_diff": 0.0,
+        "changed_fraction": 0.0,
+        "ssim": 1.0,
+        "min_local_ssim": 1.0,
+        "diff": None,
+    }
+
+    for i, (a, b) in enumerate(zip(pages_a, pages_b)):
+        if a.shape != b.shape:
+            record["size_differs"] = True
+            a, b = pad(a, b)
+        delta = np.abs(a - b)
+        changed = delta > tolerance
+        ssim = ssim_map(a, b)
+        record["mean_abs_diff"] = max(record["mean_abs_diff"], float(delta.mean()))
+        record["changed_fraction"] = max(
+            record["changed_fraction"], float(changed.mean())
+        )
+        record["ssim"] = min(record["ssim"], float(ssim.mean()))
+        record["min_local_ssim"] = min(record["min_local_ssim"], float(ssim.min()))
+
+        if diff_folder is not None and changed.any():
+            import matplotlib.pyplot as plt
+
+            suffix = f"_page{i}" if len(pages_a) > 1 else ""
+            path = Path(diff_folder) / f"{reference.stem}{suffix}_diff.png"
+            plt.imsave(path, diff_image(a, b, changed))
+            record["diff"] = path.as_posix()
+
+    return record
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "reference_folder",
+        type=Path,
+        help="Folder with the approved PDFs, e.g. plot-approval/presentation/plots",
+    )
+    parser.add_argument(
+        "plot_folder", type=Path, help="Folder with the regenerated PDFs, e.g. plots"
+    )
+    parser.add_argument("--dpi", type=float, default=100)
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.1,
+        help="Gray level difference above which a pixel counts as changed",
+    )
+    parser.add_argument(
+        "--max-changed",
+        type=float,
+        default=1e-3,
+        help="Largest tolerated fraction of changed pixels",
+    )
+    parser.add_argument(
+        "--min-ssim", type=float, default=0.99, help="Smallest tolerated mean SSIM"
+    )
+    parser.add_argument(
+        "--allow-missing",
+        action="store_true",
+        help="Do not fail for approved plots without a regenerated plot",
+    )
+    parser.add_argument("--diff-folder", type=Path, help="Folder to write diff images")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--output", type=Path, help="Path to output CSV report")
+    args = parser.parse_args()
+
+    pairs, missing = find_pairs(args.reference_folder, args.plot_folder)
+    for reference in missing:
+        print("missing", reference)
+
+    if args.diff_folder is not None:
+        args.diff_folder.mkdir(parents=True, exist_ok=True)
+
+    workers = args.workers or os.cpu_count()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(
+                compare, reference, plot, args.dpi, args.tolerance, args.diff_folder
+            )
+            for reference, plot in pairs
+        ]
+        report = pd.DataFrame.from_records([future.result() for future in futures])
+
+    if len(report) == 0:
+        raise ValueError(f"No plots to compare in {args.reference_folder}")
+
+    report["drift"] = (
+        report["size_differs"]
+        | (report["changed_fraction"] > args.max_changed)
+        | (report["ssim"] < args.min_ssim)
+    )
+    report = report.sort_values("ssim")
+
+    columns = ["reference", "changed_fraction", "ssim", "min_local_ssim", "drift"]
+    with pd.option_context("display.width", 200, "display.max_colwidth", 80):
+        print(report[columns].to_string(index=False))
+
+    if args.output is not None:
+        report.to_csv(args.output, index=False)
+
+    drifted = int(report["drift"].sum())
+    print(f"{drifted} of {len(report)} plots drifted, {len(missing)} missing")
+    sys.exit(1 if drifted or (missing and not args.allow_missing) else 0)
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+
+"""
+Build the approval bundle described by a manifest.
+
+Every plot of the manifest is rendered once per distinct set of options in a
+pool of worker processes, or copied if it is not produced here. Renders are
+kept in the build cache of `incremental.py` and reused while their inputs do
+not change, and so are failures. Targets with identical content are hard
+links to one file.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import runpy
+import shutil
+import sys
+import time
+import tomllib
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from incremental import CACHE_DIR, SOURCE_DATE_EPOCH, build_digest, file_digest
+
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_MANIFEST = REPO_DIR / "plot-approval" / "manifest.toml"
+DEFAULT_OPTIONS = {
+    # TrueType fonts are subset by matplotlib and stay selectable, unlike Type 3
+    "font_type": 42,
+    "rasterize": False,
+    "min_points": 200,
+    "dpi": None,
+    "quantize_png": False,
+}
+
+
+def parse_manifest(path, root=REPO_DIR):
+    """
+    Read a manifest into one job per target. Options are taken from the
+    `[options]` table, overridden per plot and per target.
+
+    Returns:
+    list of dict: Jobs with `script` and `args` or `source`, the absolute
+    `target` and the `options`.
+    """
+    path, root = Path(path), Path(root)
+    manifest = tomllib.loads(path.read_text())
+    unknown = set(manifest.get("options", {})) - set(DEFAULT_OPTIONS)
+    if unknown:
+        raise ValueError(f"Unknown options in {path}: {sorted(unknown)}")
+    defaults = {**DEFAULT_OPTIONS, **manifest.get("options", {})}
+    bundle = path.parent / manifest.get("output", ".")
+
+    jobs = []
+    for plot in manifest.get("plot", []):
+        if ("script" in plot) == ("source" in plot):
+            raise ValueError(f"Plot needs either a script or a source: {plot}")
+        plot_options = {k: v for k, v in plot.items() if k in DEFAULT_OPTIONS}
+        for target in plot["targets"]:
+            if isinstance(target, str):
+                target = {"path": target}
+            options = {
+                **defaults,
+                **plot_options,
+                **{k: v for k, v in target.items() if k != "path"},
+            }
+            job = {"target": (bundle / target["path"]).resolve(), "options": options}
+            if "script" in plot:
+                job["script"] = str(root / plot["script"])
+                job["args"] = [
+                    str(root / a) if (root / a).exists() else a
+                    for a in plot.get("args", [])
+                ]
+            else:
+                job["source"] = (root / plot["source"]).resolve()
+            jobs.append(job)
+    return jobs
+
+
+def render_digest(job, cache_dir=CACHE_DIR):
+    """
+    Digest of a render: the inputs, code and packages as for `incremental.py`
+    plus the export options and the format of the target.
+    """
+    command = [job["script"], *job["args"], "--output", job["target"].suffix]
+    digest = hashlib.sha256(build_digest(job["target"], command, cache_dir).encode())
+    digest.update(json.dumps(job["options"], sort_keys=True).encode())
+    return digest.hexdigest()
+
+
+def quantize_png(path, colors=256):
+    """
+    Reduce a PNG to an optimized palette image, plots have few colours.
+    """
+    from PIL import Image
+
+    with Image.open(path) as image:
+        image.load()
+    dpi = image.info.get("dpi")
+    image = image.quantize(colors, method=Image.Quantize.FASTOCTREE)
+    image.save(path, optimize=True, **({"dpi": dpi} if dpi else {}))
+
+
+def render(script, args, output, options):
+    """
+    Run a plot script in this process with the export options applied to
+    every figure it saves. Meant for a fresh worker process per plot.
+    """
+    os.environ["SOURCE_DATE_EPOCH"] = SOURCE_DATE_EPOCH
+    import matplotlib
+
+    matplotlib.use("Agg")
+    from matplotlib.figure import Figure
+
+    matplotlib.rcParams["pdf.fonttype"] = options["font_type"]
+    matplotlib.rcParams["ps.fonttype"] = options["font_type"]
+    matplotlib.rcParams["pdf.compression"] = 9
+
+    sys.path.insert(0, str(Path(script).parent))
+    from figures import rasterize_dense
+
+    savefig = Figure.savefig
+
+    def export_savefig(fig, fname, **kwargs):
+        if options["rasterize"]:
+            rasterize_dense(fig, options["min_points"])
+        if options["dpi"] is not None:
+            kwargs.setdefault("dpi", options["dpi"])
+        return savefig(fig, fname, **kwargs)
+
+    Figure.savefig = export_savefig
+    sys.argv = [script, *args, "--output", str(output)]
+    runpy.run_path(script, run_name="__main__")
+
+    if options["quantize_png"] and Path(output).suffix == ".png":
+        quantize_png(output)
+
+
+def place(content, target, link=None, cache_dir=CACHE_DIR):
+    """
+    Put `content` at `target`, as a hard link to `link` if given. Targets that
+    already are that link or have that content are left untouched, others are
+    replaced atomically so their other links are not modified.
+    """
+    if target.exists():
+        if link is not None and os.path.samefile(target, link):
+            return
+        if (
+            link is None
+            and target.stat().st_size == Path(content).stat().st_size
+            and file_digest(target, cache_dir) == file_digest(content, cache_dir)
+        ):
+            return
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+    tmp.unlink(missing_ok=True)
+    if link is not None:
+        try:
+            os.link(link, tmp)
+        except OSError:
+            shutil.copyfile(link, tmp)
+    else:
+        shutil.copyfile(content, tmp)
+    tmp.replace(target)
+
+
+def export(manifest, root=REPO_DIR, cache_dir=CACHE_DIR, workers=None, force=False):
+    """
+    Render, copy and deduplicate all targets of a manifest.
+
+    Returns:
+    (list of (str, Path, int), dict): Status, target and size per target and
+    the errors of failed renders by target.
+    """
+    cache_dir = Path(cache_dir)
+    jobs = parse_manifest(manifest, root)
+
+    # one render per distinct plot, format and options, failed renders are
+    # only repeated when their inputs change or with `force`
+    pending, contents, failed = {}, [], {}
+    for job in jobs:
+        if "source" in job:
+            contents.append((job, job["source"], "copied"))
+            continue
+        digest = render_digest(job, cache_dir)
+        stored = cache_dir / "objects" / f"{digest}{job['target'].suffix}"
+        failure = stored.with_name(f"{stored.name}.failed")
+        if not force and failure.exists():
+            failed[stored] = RuntimeError(
+                f"{failure.read_text()} (failed before, --force renders again)"
+            )
+        elif force or not stored.exists():
+            pending.setdefault(stored, job)
+        contents.append((job, stored, "cached"))
+
+    if pending:
+        with ProcessPoolExecutor(max_workers=workers, max_tasks_per_child=1) as pool:
+            futures = {}
+            for stored, job in pending.items():
+                stored.parent.mkdir(parents=True, exist_ok=True)
+                tmp = stored.with_name(
+                    f"{stored.stem}.{os.getpid()}.tmp{stored.suffix}"
+                )
+                futures[stored] = (
+                    tmp,
+                    pool.submit(
+                        render, job["script"], job["args"], tmp, job["options"]
+                    ),
+                )
+            for stored, (tmp, future) in futures.items():
+                failure = stored.with_name(f"{stored.name}.failed")
+                try:
+                    future.result()
+                    tmp.replace(stored)
+                    failure.unlink(missing_ok=True)
+                except Exception as e:
+                    failed[stored] = e
+                    failure.write_text(f"{type(e).__name__}: {e}")
+                    tmp.unlink(missing_ok=True)
+
+    results, first, errors = [], {}, {}
+    for job, content, status in contents:
+        target = job["target"]
+        if content in failed:
+            errors[target] = failed[content]
+            continue
+        if not Path(content).exists():
+            errors[target] = FileNotFoundError(content)
+            continue
+        if status == "cached" and content in pending:
+            status = "rendered"
+        digest = file_digest(content, cache_dir)
+        if digest in first:
+            place(content, target, link=first[digest], cache_dir=cache_dir)
+            status = "linked"
+        else:
+            place(content, target, cache_dir=cache_dir)
+            first[digest] = target
+        results.append((status, target, target.stat().st_size))
+    return results, errors
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("manifest", type=Path, nargs="?", default=DEFAULT_MANIFEST)
+    parser.add_argument(
+        "--root",
+        type=Path,
+        default=REPO_DIR,
+        help="Folder the scripts, arguments and sources of the manifest are in",
+    )
+    parser.add_argument("--cache-dir", type=Path, default=CACHE_DIR)
+    parser.add_argument(
+        "--workers", type=int, help="Parallel renders, default all cores"
+    )
+    parser.add_argument("--force", action="store_true", help="Render everything")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    results, errors = export(
+        args.manifest, args.root, args.cache_dir, args.workers, args.force
+    )
+    bundle_size = 0
+    for status, target, size in results:
+        print(f"{status:>8} {size / 1024:8.1f} kB {target}")
+        if status != "linked":
+            bundle_size += size
+    for target, error in errors.items():
+        print(f"  failed {target}: {type(error).__name__}: {error}", file=sys.stderr)
+    print(
+        f"{len(results)} targets, {bundle_size / 1024:.1f} kB without duplicates, "
+        f"{time.perf_counter() - start:.1f}s"
+    )
+    sys.exit(1 if errors else 0)
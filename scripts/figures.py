@@ -0,0 +1,117 @@
+import io
+import pickle
+from functools import lru_cache
+
+import matplotlib.pyplot as plt
+import numpy as np
+import atlasify
+
+
+class RatioFigureTemplate:
+    """
+    Styled main + ratio panel figure that is built once and cloned for every
+    plot. Cloning unpickles the prepared figure, which is several times cheaper
+    than building and styling a new one.
+    """
+
+    def __init__(self, figsize=(6, 4), dpi=200, hspace=0.02, height_ratios=(10, 4)):
+        atlasify.monkeypatch_axis_labels()
+
+        fig, axs = plt.subplots(
+            2,
+            1,
+            figsize=figsize,
+            dpi=dpi,
+            sharex=True,
+            gridspec_kw={"height_ratios": list(height_ratios), "hspace": hspace},
+            layout="constrained",
+        )
+        self._pickled = pickle.dumps(fig)
+        plt.close(fig)
+
+    def clone(self):
+        fig = pickle.loads(self._pickled)
+        return fig, np.array(fig.axes)
+
+
+@lru_cache(maxsize=None)
+def ratio_template(figsize=(6, 4), dpi=200, hspace=0.02):
+    return RatioFigureTemplate(figsize=figsize, dpi=dpi, hspace=hspace)
+
+
+def ratio_figure(figsize=(6, 4), dpi=200, hspace=0.02):
+    """
+    Return a new figure with a main and a ratio panel from the cached template.
+    """
+    return ratio_template(figsize=figsize, dpi=dpi, hspace=hspace).clone()
+
+
+def atlasify_main(ax, subtext=None, enlarge=None, atlas="Simulation Preliminary"):
+    atlasify.atlasify(
+        axes=ax,
+        brand="ATLAS",
+        atlas=atlas,
+        subtext=subtext,
+        enlarge=enlarge,
+    )
+
+
+def atlasify_plain(ax):
+    atlasify.atlasify(
+        axes=ax,
+        brand=None,
+        atlas=None,
+        subtext=None,
+    )
+
+
+def rasterize_dense(fig, min_points=200):
+    """
+    Rasterize the artists of `fig` with at least `min_points` points, e.g.
+    long lines, filled areas or error bars of many bins, while axes, labels
+    and text stay vector graphics. Collections count the vertices of all their
+    paths. The raster resolution is the dpi the figure is saved with.
+
+    Returns:
+    int: Number of rasterized artists.
+    """
+    from matplotlib.collections import Collection
+    from matplotlib.lines import Line2D
+
+    count = 0
+    for artist in fig.findobj(lambda a: isinstance(a, (Line2D, Collection))):
+        if isinstance(artist, Line2D):
+            points = len(artist.get_xdata())
+        else:
+            points = max(
+                sum(len(path.vertices) for path in artist.get_paths()),
+                len(artist.get_offsets()),
+            )
+        if points >= min_points:
+            artist.set_rasterized(True)
+            count += 1
+    return count
+
+
+@lru_cache(maxsize=None)
+def warm():
+    """
+    Render a throwaway plot once so that the font lookup, mathtext and text
+    layout caches are populated. Only worth it in long-lived processes which
+    render many plots.
+    """
+    fig, axs = ratio_figure()
+    x = np.linspace(-4, 4, 40)
+    axs[0].errorbar(x, np.ones_like(x), yerr=0.1, linestyle="", marker="o")
+    axs[0].legend(["Non-ACTS"])
+    axs[0].set_ylabel("$\\sigma(d_0)$ [μm]")
+    axs[1].set_xlabel("$\\eta$")
+    atlasify_main(
+        axs[0],
+        subtext="$\\sqrt{s} = 14$ TeV, HL-LHC\n$t\\bar{t}$, $\\langle \\mu \\rangle$ = 200",
+        enlarge=2.0,
+    )
+    atlasify_plain(axs[1])
+    for fmt in ["png", "pdf"]:
+        fig.savefig(io.BytesIO(), format=fmt)
+    plt.close(fig)
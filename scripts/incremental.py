@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+
+import argparse
+import ast
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+from importlib import metadata
+from pathlib import Path
+
+
+CACHE_VERSION = 2
+CACHE_DIR = Path(".build-cache")
+PACKAGES = ["numpy", "scipy", "pandas", "matplotlib", "atlasify", "uproot"]
+# matplotlib takes the PDF and PS creation dates from this instead of the clock
+SOURCE_DATE_EPOCH = "0"
+
+
+def _remembered_digest(path, cache_dir, kind, compute):
+    """
+    Digest of a file from `compute`, remembered per path and kind and
+    invalidated by size and modification time.
+    """
+    path = Path(path).resolve()
+    stat = path.stat()
+    key = hashlib.sha1(f"{kind}:{path.as_posix()}".encode()).hexdigest()
+    record_path = Path(cache_dir) / "files" / f"{key}.json"
+
+    if record_path.exists():
+        record = json.loads(record_path.read_text())
+        if record["size"] == stat.st_size and record["mtime_ns"] == stat.st_mtime_ns:
+            return record["digest"]
+
+    record = {
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "digest": compute(path),
+    }
+
+    record_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = record_path.with_name(f"{record_path.name}.{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(record))
+    tmp.replace(record_path)
+    return record["digest"]
+
+
+def file_digest(path, cache_dir=CACHE_DIR):
+    """
+    Content digest of a file, remembered so large inputs are only read again
+    if they changed.
+    """
+
+    def compute(path):
+        digest = hashlib.sha256()
+        with open(path, "rb") as file:
+            for chunk in iter(lambda: file.read(1 << 20), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    return _remembered_digest(path, cache_dir, "content", compute)
+
+
+def source_digest(path, cache_dir=CACHE_DIR):
+    """
+    Digest of the syntax tree of a Python file, so changes to comments or the
+    formatting do not count as changes.
+    """
+
+    def compute(path):
+        tree = ast.parse(path.read_text(), filename=str(path))
+        return hashlib.sha256(ast.dump(tree).encode()).hexdigest()
+
+    return _remembered_digest(path, cache_dir, "source", compute)
+
+
+def path_digest(path, cache_dir=CACHE_DIR):
+    path = Path(path)
+    if path.is_file():
+        return file_digest(path, cache_dir)
+    digest = hashlib.sha256()
+    for child in sorted(p for p in path.rglob("*") if p.is_file()):
+        digest.update(child.relative_to(path).as_posix().encode())
+        digest.update(file_digest(child, cache_dir).encode())
+    return digest.hexdigest()
+
+
+def local_modules(script):
+    """
+    The script and the modules next to it which it imports, transitively.
+    """
+    script = Path(script).resolve()
+    modules, todo = set(), [script]
+    while todo:
+        path = todo.pop()
+        if path in modules:
+            continue
+        modules.add(path)
+        for node in ast.walk(ast.parse(path.read_text(), filename=str(path))):
+            if isinstance(node, ast.Import):
+                names = [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+                names = [node.module]
+            else:
+                continue
+            for name in names:
+                candidate = script.parent / f"{name.split('.')[0]}.py"
+                if candidate.exists():
+                    todo.append(candidate)
+    return sorted(modules)
+
+
+def package_versions(packages=PACKAGES):
+    versions = {"python": sys.version.split()[0]}
+    for package in packages:
+        try:
+            versions[package] = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            versions[package] = None
+    return versions
+
+
+def build_digest(output, command, cache_dir=CACHE_DIR):
+    """
+    Digest of everything a plot depends on: the command line, the content of
+    every file or folder it names, the Python scripts it runs including their
+    local imports and the versions of the packages doing the rendering.
+    Scripts and modules count by their syntax tree.
+    """
+    output = Path(output).resolve()
+    inputs = {}
+    for argument in command:
+        if not Path(argument).exists() or Path(argument).resolve() == output:
+            continue
+        if argument.endswith(".py"):
+            for module in local_modules(argument):
+                inputs[module.as_posix()] = source_digest(module, cache_dir)
+        else:
+            inputs[argument] = path_digest(argument, cache_dir)
+
+    manifest = {
+        "version": CACHE_VERSION,
+        "command": command,
+        "inputs": inputs,
+        "packages": package_versions(),
+        "source_date_epoch": SOURCE_DATE_EPOCH,
+    }
+    return hashlib.sha256(json.dumps(manifest, sort_keys=True).encode()).hexdigest()
+
+
+def same_content(a, b):
+    return (
+        a.exists()
+        and b.stat().st_size == a.stat().st_size
+        and (a.read_bytes() == b.read_bytes())
+    )
+
+
+def run(output, command, cache_dir=CACHE_DIR, force=False):
+    """
+    Produce `output` by running `command` unless an output for the same digest
+    is already stored in `cache_dir`.
+
+    Returns:
+    bool: Whether the command was run.
+    """
+    output, cache_dir = Path(output), Path(cache_dir)
+    digest = build_digest(output, command, cache_dir)
+    stored = cache_dir / "objects" / f"{digest}{output.suffix}"
+
+    if stored.exists() and not force:
+        if not same_content(output, stored):
+            output.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(stored, output)
+        # keep mtime based schedulers from considering the output stale
+        os.utime(output)
+        return False
+
+    env = dict(os.environ, SOURCE_DATE_EPOCH=SOURCE_DATE_EPOCH)
+    subprocess.run(command, env=env, check=True)
+
+    stored.parent.mkdir(parents=True, exist_ok=True)
+    tmp = stored.with_name(f"{stored.name}.{os.getpid()}.tmp")
+    shutil.copyfile(output, tmp)
+    tmp.replace(stored)
+    return True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Render a plot only if its inputs, code or config changed",
+        usage="%(prog)s [-h] [--cache-dir CACHE_DIR] [--force] output -- command ...",
+    )
+    parser.add_argument("output", type=Path, help="File written by the command")
+    parser.add_argument("--cache-dir", type=Path, default=CACHE_DIR)
+    parser.add_argument("--force", action="store_true", help="Always run")
+
+    # everything after the first `--` is the command, options included
+    argv = sys.argv[1:]
+    split = argv.index("--") if "--" in argv else len(argv)
+    args = parser.parse_args(argv[:split])
+    command = argv[split + 1 :]
+    if len(command) == 0:
+        parser.error("no command given after --")
+
+    rendered = run(args.output, command, args.cache_dir, args.force)
+    print("rendered" if rendered else "unchanged", args.output)
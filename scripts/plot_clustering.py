@@ -3,13 +3,24 @@
 import argparse
 from pathlib import Path
 import matplotlib.pyplot as plt
-import uproot
 import awkward as ak
 import scipy.stats
 import numpy as np
-import atlasify
 
-from common import markers, colors, robust_mean, robust_std, ratio_std
+from common import (
+    markers,
+    colors,
+    robust_mean,
+    robust_std,
+    binned_bootstrap_robust_gauss_fit,
+    bootstrap_interval,
+    bootstrap_ratio_interval,
+    bootstrap_robust_gauss_fit,
+    pair_events,
+    ratio_std,
+    read_object,
+)
+from figures import atlasify_main, atlasify_plain, ratio_figure
 
 
 base_dir = Path(__file__).parent.parent.parent
@@ -17,6 +28,45 @@ base_dir = Path(__file__).parent.parent.parent
 parser = argparse.ArgumentParser()
 parser.add_argument("input", type=Path)
 parser.add_argument("mode", choices=["pixelalg", "pixeltool", "stripalg", "striptool"])
+parser.add_argument(
+    "--resamples",
+    type=int,
+    default=200,
+    help="Number of bootstrap resamples for the ratio uncertainty",
+)
+parser.add_argument("--seed", type=int, default=0, help="Bootstrap seed")
+parser.add_argument(
+    "--bootstrap-errors",
+    action="store_true",
+    help="Bootstrap interval of the ratio of the robust means instead of the "
+    "propagated RMS, always used with --paired",
+)
+parser.add_argument(
+    "--paired",
+    action="store_true",
+    help="Compare the execution times event by event instead of the binned means",
+)
+parser.add_argument(
+    "--min-entries",
+    type=int,
+    default=10,
+    help="Events a bin needs for a paired ratio, sparser bins are left empty",
+)
+parser.add_argument(
+    "--reference",
+    type=Path,
+    help="Monitoring file of the reference, e.g. another nightly, default the input",
+)
+parser.add_argument(
+    "--reference-algorithm",
+    choices=["athena", "acts"],
+    default="athena",
+    help="Algorithm of the reference the ACTS times are divided by",
+)
+parser.add_argument(
+    "--event-branch",
+    help="Branch identifying the events when pairing, default the entry index",
+)
 parser.add_argument(
     "--output",
     type=Path,
@@ -47,10 +97,31 @@ else:
 bin_mid = 0.5 * (bin_edges[:-1] + bin_edges[1:])
 bin_size = 0.5 * (bin_edges[1:] - bin_edges[:-1])
 
-data = uproot.open(args.input)
+if args.reference_algorithm == "acts":
+    path_athena = path_acts
+    label_athena = "ACTS-based, Reference"
+    label_ratio = "ACTS / Reference"
+else:
+    label_athena = "Non-ACTS"
+    label_ratio = "ACTS / Non-ACTS"
+
+data_athena = ak.to_dataframe(read_object(args.reference or args.input, path_athena))
+data_acts = ak.to_dataframe(read_object(args.input, path_acts))
 
-data_athena = ak.to_dataframe(data[path_athena].arrays(library="ak"))
-data_acts = ak.to_dataframe(data[path_acts].arrays(library="ak"))
+if args.paired:
+    if args.event_branch is None:
+        keys_athena = np.arange(len(data_athena))
+        keys_acts = np.arange(len(data_acts))
+    else:
+        keys_athena = data_athena.pop(args.event_branch).to_numpy()
+        keys_acts = data_acts.pop(args.event_branch).to_numpy()
+    index_athena, index_acts = pair_events(keys_athena, keys_acts)
+    print(
+        f"paired {len(index_athena)} of {len(data_athena)} reference and "
+        f"{len(data_acts)} ACTS events"
+    )
+    data_athena = data_athena.iloc[index_athena].reset_index(drop=True)
+    data_acts = data_acts.iloc[index_acts].reset_index(drop=True)
 
 mean_athena, _, _ = scipy.stats.binned_statistic(
     data_athena["NClustersCreated"],
@@ -78,36 +149,99 @@ std_acts, _, _ = scipy.stats.binned_statistic(
     statistic=robust_std,
 )
 
+if args.paired:
+    # every event is its own control, the workload cancels in the ratio
+    event_ratio = (
+        data_acts["TIME_execute"].to_numpy() / data_athena["TIME_execute"].to_numpy()
+    )
+    event_x = data_athena["NClustersCreated"].to_numpy()
+    ok = np.isfinite(event_ratio)
+    event_ratio, event_x = event_ratio[ok], event_x[ok]
+
+    ratio, _, _ = scipy.stats.binned_statistic(
+        event_x, event_ratio, bins=bin_edges, statistic=robust_mean
+    )
+    boot_ratio, _ = binned_bootstrap_robust_gauss_fit(
+        event_x,
+        event_ratio,
+        bin_edges,
+        n_resamples=args.resamples,
+        seed=args.seed,
+    )
+    ratio_lo, ratio_hi = bootstrap_interval(boot_ratio)
+    quantile_lo, quantile_hi = (
+        scipy.stats.binned_statistic(
+            event_x,
+            event_ratio,
+            bins=bin_edges,
+            statistic=lambda r: np.quantile(r, q) if len(r) else np.nan,
+        )[0]
+        for q in [0.16, 0.84]
+    )
+    # a handful of events gives neither a robust mean nor a bootstrap interval
+    sparse = np.histogram(event_x, bins=bin_edges)[0] < args.min_entries
+    for values in (ratio, ratio_lo, ratio_hi, quantile_lo, quantile_hi):
+        values[sparse] = np.nan
+
+    total_boot, _ = bootstrap_robust_gauss_fit(
+        event_ratio, args.resamples, seed=args.seed
+    )
+    total_lo, total_hi = bootstrap_interval(total_boot)
+    quantiles = np.quantile(event_ratio, [0.05, 0.16, 0.5, 0.84, 0.95])
+    print(
+        f"{label_ratio} per event: robust mean {robust_mean(event_ratio):.4f} "
+        f"[{total_lo:.4f}, {total_hi:.4f}], quantiles 5/16/50/84/95% "
+        + " ".join(f"{q:.4f}" for q in quantiles)
+    )
+elif args.bootstrap_errors:
+    # uncertainty of the ratio of the robust means, not of the spread
+    boot_athena, _ = binned_bootstrap_robust_gauss_fit(
+        data_athena["NClustersCreated"],
+        data_athena["TIME_execute"],
+        bin_edges,
+        n_resamples=args.resamples,
+        seed=args.seed,
+    )
+    boot_acts, _ = binned_bootstrap_robust_gauss_fit(
+        data_acts["NClustersCreated"],
+        data_acts["TIME_execute"],
+        bin_edges,
+        n_resamples=args.resamples,
+        seed=args.seed + 1,
+    )
+    ratio = mean_acts / mean_athena
+    ratio_lo, ratio_hi = bootstrap_ratio_interval(boot_acts, boot_athena)
+
 ymin = mean_athena.min()
 mean_athena /= ymin
 mean_acts /= ymin
 std_athena /= ymin
 std_acts /= ymin
 
-atlasify.monkeypatch_axis_labels()
+if args.paired or args.bootstrap_errors:
+    ratio_err = (
+        np.clip(ratio - ratio_lo, 0, None),
+        np.clip(ratio_hi - ratio, 0, None),
+    )
+else:
+    # the RMS propagated to the ratio
+    ratio = mean_acts / mean_athena
+    ratio_err = ratio_std(mean_acts, mean_athena, std_acts, std_athena)
 
-fig, axs = plt.subplots(
-    2,
-    1,
-    figsize=(6, 4),
-    dpi=200,
-    sharex=True,
-    gridspec_kw={"height_ratios": [10, 4], "hspace": 0.02},
-    layout="constrained",
-)
+fig, axs = ratio_figure()
 
 # axs[0].set_xlabel(xlabel)
 axs[0].set_ylabel("Average Execution Time [A.U.]")
 
 axs[1].set_xlabel(xlabel)
-axs[1].set_ylabel("ACTS / Non-ACTS")
+axs[1].set_ylabel(label_ratio)
 
 axs[0].errorbar(
     x=bin_mid,
     y=mean_athena,
     xerr=bin_size,
     yerr=std_athena,
-    label="Non-ACTS\nMean $\\pm$ RMS",
+    label=f"{label_athena}\nMean $\\pm$ RMS",
     linestyle="",
     color=colors[0],
     marker=markers[0],
@@ -132,13 +266,7 @@ ITk Layout: 03-00-00
 ACTS v43.0.1, Athena 25.0.40
 """.strip()
 
-atlasify.atlasify(
-    axes=axs[0],
-    brand="ATLAS",
-    atlas="Simulation Preliminary",
-    subtext=subtext,
-    enlarge=1.8,
-)
+atlasify_main(axs[0], subtext=subtext, enlarge=1.8)
 
 ylim = axs[0].get_ylim()
 axs[0].set_ylim(0, ylim[1])
@@ -150,27 +278,27 @@ axs[0].set_ylim(0, ylim[1])
 #     linestyle="--",
 #     color=colors[0],
 # )
+if args.paired:
+    # both edges of every bin, so bins next to empty ones keep their band
+    axs[1].fill_between(
+        np.repeat(bin_edges, 2)[1:-1],
+        np.repeat(quantile_lo, 2),
+        np.repeat(quantile_hi, 2),
+        color=colors[1],
+        alpha=0.2,
+        linewidth=0,
+    )
 axs[1].errorbar(
     bin_mid,
-    mean_acts / mean_athena,
-    yerr=ratio_std(
-        mean_acts,
-        mean_athena,
-        std_acts,
-        std_athena,
-    ),
+    ratio,
+    yerr=ratio_err,
     xerr=bin_size,
     linestyle="",
     color=colors[1],
     marker=markers[1],
 )
 
-atlasify.atlasify(
-    axes=axs[1],
-    brand=None,
-    atlas=None,
-    subtext=None,
-)
+atlasify_plain(axs[1])
 axs[1].xaxis.get_offset_text().set_x(1.07)
 axs[1].xaxis.get_offset_text().set_va("bottom")
 
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+
+import argparse
+from pathlib import Path
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+from common import markers, colors, binned_robust_mean_std, robust_mean
+from spot import DEFAULT_CATEGORIES, REFERENCE_HS23, load, parse_category
+from figures import atlasify_main, atlasify_plain, ratio_figure
+
+
+# (4) tuning the redundancy of the pixel seeding
+DEFAULT_PERIODS = [("Before restriction", None), ("After restriction", "2025-07-22")]
+
+parser = argparse.ArgumentParser()
+parser.add_argument(
+    "input_folder", type=Path, help="Path to input folder containing SPOT CSV files"
+)
+parser.add_argument("mode", choices=["pixel", "strip"])
+parser.add_argument(
+    "--period",
+    action="append",
+    metavar="LABEL[,START]",
+    help="Configuration period starting at the given date, repeat in order, "
+    "default split at 2025-07-22 when the pixel seeding redundancy was tuned",
+)
+parser.add_argument(
+    "--monitoring",
+    action="append",
+    metavar="LABEL=PATH",
+    help="Per-event seeding monitoring file of one configuration period",
+)
+parser.add_argument(
+    "--tree",
+    help="Tree of the seeding monitoring with the seed count and execution time, "
+    "default `<Alg>/TimeVsSeeds`. The shipped monitoring files have no seeding "
+    "trees, the default assumes the naming of the `TimeVsClusters` trees",
+)
+parser.add_argument(
+    "--seeds-branch",
+    default="NSeedsCreated",
+    help="Branch of the tree with the number of seeds, assumed like the tree",
+)
+parser.add_argument(
+    "--category",
+    action="append",
+    help="SPOT category as `name[,start[,end]]`, repeat in order of priority",
+)
+parser.add_argument("--bins", type=int, default=12, help="Number of seed count bins")
+parser.add_argument(
+    "--output",
+    type=Path,
+    help="Path to output file",
+)
+parser.add_argument("--show", action="store_true", help="Show plot")
+args = parser.parse_args()
+
+algorithm = {
+    "pixel": "ActsPixelSeedingAlg",
+    "strip": "ActsStripSeedingAlg",
+}[args.mode]
+monitoring_path = args.tree or f"{algorithm}/TimeVsSeeds"
+
+periods = DEFAULT_PERIODS
+if args.period:
+    periods = [
+        tuple(spec.split(",", 1)) if "," in spec else (spec, None)
+        for spec in args.period
+    ]
+
+if args.monitoring:
+    import uproot
+
+    samples = []
+    for spec in args.monitoring:
+        label, path = spec.split("=", 1)
+        tree = uproot.open(path)[monitoring_path]
+        samples.append(
+            (
+                label,
+                tree[args.seeds_branch].array(library="np"),
+                tree["TIME_execute"].array(library="np"),
+            )
+        )
+    xlabel = "Number of Seeds"
+    ylabel = "Average Execution Time [A.U.]"
+else:
+    categories = (
+        [parse_category(spec) for spec in args.category]
+        if args.category
+        else DEFAULT_CATEGORIES
+    )
+    df = load(args.input_folder, categories)
+    df = df[(df[algorithm] > 0) & (df["input_seeds"] > 0)]
+    if len(df) == 0:
+        raise ValueError(
+            f"No nightlies with {algorithm} timings in {args.input_folder}"
+        )
+
+    dates = df["build_date"].to_numpy()
+    period = np.zeros(len(df), dtype=int)
+    for i, (_, start) in enumerate(periods):
+        if start:
+            period[dates >= np.datetime64(pd.Timestamp(start))] = i
+    samples = [
+        (
+            label,
+            df["input_seeds"].to_numpy()[period == i],
+            df[algorithm].to_numpy()[period == i] * REFERENCE_HS23,
+        )
+        for i, (label, _) in enumerate(periods)
+    ]
+    xlabel = "Average Number of Seeds"
+    ylabel = "Seeding time [HS23$\\times{}$s]"
+
+samples = [(label, x, y) for label, x, y in samples if len(x) > 0]
+if len(samples) == 0:
+    raise ValueError("No data in any configuration period")
+
+all_x = np.concatenate([x for _, x, _ in samples])
+bin_edges = np.histogram_bin_edges(all_x, bins=args.bins)
+bin_mid = 0.5 * (bin_edges[:-1] + bin_edges[1:])
+bin_size = 0.5 * (bin_edges[1:] - bin_edges[:-1])
+
+summary = []
+for label, x, y in samples:
+    counts, _ = np.histogram(x, bins=bin_edges)
+    mean, std = binned_robust_mean_std(x, y, bin_edges)
+    mean[counts == 0] = np.nan
+    std[counts == 0] = np.nan
+    summary.append((label, mean, std, robust_mean(y), robust_mean(x)))
+
+ref_time, ref_seeds = summary[0][3], summary[0][4]
+for label, _, _, time, seeds in summary:
+    print(
+        f"{label}: {time:.4g} per event, {seeds:.5g} seeds,",
+        f"throughput gain {ref_time / time - 1:+.1%},",
+        f"seeds {seeds / ref_seeds - 1:+.1%}",
+    )
+
+fig, axs = ratio_figure()
+
+axs[0].set_ylabel(ylabel)
+axs[1].set_xlabel(xlabel)
+axs[1].set_ylabel("Time / seed [A.U.]")
+
+ref_per_seed = ref_time / ref_seeds
+for i, (label, mean, std, time, _) in enumerate(summary):
+    gain = ref_time / time - 1
+    axs[0].errorbar(
+        x=bin_mid,
+        y=mean,
+        xerr=bin_size,
+        yerr=std,
+        label=label if i == 0 else f"{label}\nThroughput {gain:+.0%}",
+        linestyle="",
+        color=colors[i % len(colors)],
+        marker=markers[i % len(markers)],
+    )
+    axs[1].errorbar(
+        x=bin_mid,
+        y=mean / bin_mid / ref_per_seed,
+        xerr=bin_size,
+        yerr=std / bin_mid / ref_per_seed,
+        linestyle="",
+        color=colors[i % len(colors)],
+        marker=markers[i % len(markers)],
+    )
+
+axs[0].legend()
+
+subtext = r"""
+$\sqrt{s} = 14$ TeV, HL-LHC
+$t\bar{t}$, $\langle \mu \rangle$ = 200
+ITk Layout: 03-00-00
+""".strip()
+
+atlasify_main(axs[0], subtext=subtext, enlarge=2.2, atlas="Simulation Internal")
+
+ylim = axs[0].get_ylim()
+axs[0].set_ylim(0, ylim[1])
+
+atlasify_plain(axs[1])
+
+plt.ticklabel_format(style="sci", axis="x", scilimits=(-5, 5), useMathText=True)
+
+if args.output is not None:
+    fig.savefig(args.output)
+
+if args.output is None or args.show:
+    plt.show()
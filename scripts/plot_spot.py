@@ -4,6 +4,7 @@
 # requires-python = ">=3.11"
 # dependencies = [
 #  "matplotlib",
+#  "numpy",
 #  "pandas",
 #  "atlasify"
 # ]
@@ -14,9 +15,21 @@ from pathlib import Path
 from datetime import datetime, timedelta
 
 import matplotlib.pyplot as plt
-import pandas as pd
 import atlasify
 
+from spot import (
+    COMPONENTS,
+    DEFAULT_CATEGORIES,
+    LABELS,
+    REFERENCE_HS23,
+    category_label,
+    load,
+    parse_category,
+    segments,
+)
+
+
+base_dir = Path(__file__).parent.parent
 
 parser = argparse.ArgumentParser()
 parser.add_argument(
@@ -27,64 +40,73 @@ parser.add_argument(
     type=Path,
     help="Path to output file",
 )
+parser.add_argument(
+    "--category",
+    action="append",
+    help="SPOT category as `name[,start[,end]]`, repeat in order of priority",
+)
+parser.add_argument(
+    "--fetch",
+    metavar="URL",
+    help="Fetch the CSV files from a SPOT results service into the fetch cache, "
+    "the CSV files in the input folder are used for categories which fail",
+)
+parser.add_argument(
+    "--fetch-cache",
+    type=Path,
+    default=base_dir / ".spot-cache",
+    help="Folder to store fetched CSV files in",
+)
+parser.add_argument(
+    "--annotate-sources",
+    action="store_true",
+    help="Mark which category supplied each segment",
+)
+parser.add_argument(
+    "--html",
+    type=Path,
+    help="Path to output interactive HTML dashboard of all SPOT columns",
+)
 parser.add_argument("--show", action="store_true", help="Show plot")
 
 args = parser.parse_args()
 
-df_main_fast = pd.read_csv(
-    args.input_folder / "cern_results_spot-mon-phase2_recoonly_actsfasttracking.csv"
-)
-df_main_mixed = pd.read_csv(
-    args.input_folder / "cern_results_spot-mon-phase2_recoonly_actstracking.csv"
+categories = (
+    [parse_category(spec) for spec in args.category]
+    if args.category
+    else DEFAULT_CATEGORIES
 )
 
-df_main_fast["build_date"] = pd.to_datetime(df_main_fast["build_date"])
-df_main_fast = df_main_fast.sort_values(by="build_date")
-df_main_fast.index = df_main_fast["build_date"]
+atlasify.monkeypatch_axis_labels()
 
-df_main_mixed["build_date"] = pd.to_datetime(df_main_mixed["build_date"])
-df_main_mixed = df_main_mixed.sort_values(by="build_date")
-df_main_mixed.index = df_main_mixed["build_date"]
+results = None
+if args.fetch is not None:
+    from spot_fetch import fetch
 
-atlasify.monkeypatch_axis_labels()
+    results = fetch(
+        args.fetch,
+        [name for name, _, _ in categories],
+        args.fetch_cache,
+        strict=False,
+    )
 
-# fig, ax = plt.subplots(figsize=(10, 5), dpi=200)
-# df_main_mixed.plot(y="ActsTrackFindingAlg", kind="line", ax=ax)
-# ax.set_ylim(0, 3)
-# fig, ax = plt.subplots(figsize=(10, 5), dpi=200)
-# df_main_fast.plot(y="ActsTrackFindingAlg", kind="line", ax=ax)
-# ax.set_ylim(0, 3)
+df_main = load(args.input_folder, categories, results)
 
-stitch = df_main_fast.build_date.max()
-print("stitch", stitch)
-df_main = pd.concat([df_main_fast, df_main_mixed[df_main_mixed.build_date > stitch]])
+for source, start, end in segments(df_main):
+    print("segment", category_label(source), start, end)
 
-# fig, ax = plt.subplots(figsize=(10, 5), dpi=200)
-# df_main.plot(y="ActsTrackFindingAlg", kind="line", ax=ax)
-# ax.set_ylim(0, 3)
+if args.html is not None:
+    from spot_dashboard import export
 
-df_main
+    export(df_main, args.html)
 
 fig, ax = plt.subplots(1, 1, figsize=(10, 4), dpi=200)
 # fig.subplots_adjust(wspace=0.01)
 
-components = [
-    "ActsTrackFindingAlg",
-    "ActsPixelSeedingAlg",
-    "ActsPixelClusterizationAlg",
-    "ActsStripClusterizationAlg",
-    "ActsAmbiguityResolutionAlg",
-]
-
-labels = [
-    "Track finding",
-    "Pixel seeding",
-    "Pixel clusterization",
-    "Strip clusterization",
-    "Ambiguity resolution",
-]
+components = COMPONENTS
+labels = LABELS
 
-HS23 = 27
+HS23 = REFERENCE_HS23
 
 pad = timedelta(days=0)
 xmin = datetime(2024, 7, 12)  # - pad
@@ -140,6 +162,27 @@ for component, label in zip(components, labels):
 ax.plot(plot_df["build_date"], time_sum, label="Total", color="black", linewidth=1.5)
 # ax2.plot(zoom_df["build_date"], time_sum_zoom, label="Total", color="black", linewidth=1.5)
 
+if args.annotate_sources:
+    for i, (source, start, end) in enumerate(segments(plot_df)):
+        ax.axvspan(
+            start,
+            end,
+            ymin=0,
+            ymax=0.02,
+            color=f"C{i % 10}",
+            alpha=0.5,
+            ec="none",
+        )
+        ax.text(
+            start,
+            0.03,
+            category_label(source),
+            transform=ax.get_xaxis_transform(),
+            va="bottom",
+            ha="left",
+            fontsize=6,
+            color="gray",
+        )
 
 _, ymax = ax.get_ylim()
 # ax.set_ylim(0, ymax*1.21)
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+
+# /// script
+# requires-python = ">=3.11"
+# dependencies = [
+#  "matplotlib",
+#  "numpy",
+#  "pandas",
+#  "atlasify"
+# ]
+# ///
+
+import argparse
+from pathlib import Path
+from datetime import datetime
+
+import matplotlib.pyplot as plt
+import atlasify
+
+from spot import (
+    COMPONENTS,
+    DEFAULT_CATEGORIES,
+    LABELS,
+    capacity,
+    load,
+    parse_category,
+    read_cpu_models,
+)
+
+
+base_dir = Path(__file__).parent.parent
+
+parser = argparse.ArgumentParser()
+parser.add_argument(
+    "input_folder", type=Path, help="Path to input folder containing CSV files"
+)
+parser.add_argument(
+    "--cpu-models",
+    type=Path,
+    default=base_dir / "data/capacity/cpu_models.csv",
+    help="CSV table with HS23 per core and cores per node for each CPU model",
+)
+parser.add_argument(
+    "--cpu-model",
+    help="CPU model used for the node count, defaults to the first in the table",
+)
+parser.add_argument("--rate", type=float, default=1e6, help="Target input rate in Hz")
+parser.add_argument("--budget", type=float, help="Available farm capacity in HS23")
+parser.add_argument(
+    "--category",
+    action="append",
+    help="SPOT category as `name[,start[,end]]`, repeat in order of priority",
+)
+parser.add_argument(
+    "--table",
+    type=Path,
+    help="Path to output CSV with the projection for every nightly and algorithm",
+)
+parser.add_argument(
+    "--output",
+    type=Path,
+    help="Path to output file",
+)
+parser.add_argument("--show", action="store_true", help="Show plot")
+
+args = parser.parse_args()
+
+categories = (
+    [parse_category(spec) for spec in args.category]
+    if args.category
+    else DEFAULT_CATEGORIES
+)
+
+df_main = load(args.input_folder, categories)
+df_main = df_main[df_main[COMPONENTS].sum(axis=1) > 0]
+
+cpu_models = read_cpu_models(args.cpu_models)
+cpu_model = args.cpu_model or cpu_models["cpu_model"].iloc[0]
+if cpu_model not in set(cpu_models["cpu_model"]):
+    raise ValueError(f"Unknown CPU model: {cpu_model}")
+
+projection = capacity(df_main, cpu_models, rate=args.rate, budget=args.budget)
+
+if args.table is not None:
+    projection.to_csv(args.table, index=False)
+
+latest = projection[projection["build_date"] == projection["build_date"].max()]
+print(latest.to_string(index=False))
+
+projection = projection[projection["cpu_model"] == cpu_model]
+by_algorithm = {
+    algorithm: group for algorithm, group in projection.groupby("algorithm")
+}
+total = by_algorithm["Total"]
+
+atlasify.monkeypatch_axis_labels()
+
+nrows = 2 if args.budget is not None else 1
+fig, axs = plt.subplots(
+    nrows,
+    1,
+    figsize=(10, 3 + 2 * nrows),
+    dpi=200,
+    sharex=True,
+    squeeze=False,
+    gridspec_kw={"height_ratios": [10, 4][:nrows], "hspace": 0.02},
+    layout="constrained",
+)
+axs = axs[:, 0]
+
+for component, label in zip(COMPONENTS, LABELS):
+    if component not in by_algorithm:
+        continue
+    group = by_algorithm[component]
+    axs[0].plot(group["build_date"], group["nodes_required"], label=label)
+axs[0].plot(
+    total["build_date"],
+    total["nodes_required"],
+    label="Total",
+    color="black",
+    linewidth=1.5,
+)
+
+if args.budget is not None:
+    hs23_per_node = cpu_models.set_index("cpu_model").loc[cpu_model]
+    hs23_per_node = hs23_per_node["hs23_per_core"] * hs23_per_node["cores_per_node"]
+    axs[0].axhline(args.budget / hs23_per_node, color="gray", linestyle="--")
+    axs[0].text(
+        total["build_date"].iloc[0],
+        args.budget / hs23_per_node,
+        "Budget",
+        va="bottom",
+        ha="left",
+        color="gray",
+    )
+
+    axs[1].plot(total["build_date"], 100 * total["headroom"], color="black")
+    axs[1].axhline(0, color="gray", linestyle="--")
+    axs[1].set_ylabel("Headroom [%]")
+
+    atlasify.atlasify(
+        axes=axs[1],
+        brand=None,
+        atlas=None,
+        subtext=None,
+    )
+
+axs[0].set_ylabel("Nodes required")
+axs[-1].set_xlabel("Date")
+axs[0].set_xlim(datetime(2024, 7, 12), total["build_date"].max())
+axs[0].legend(bbox_to_anchor=(0.5, 0.9999), loc="upper left", ncol=2, frameon=False)
+
+s = f"""
+{cpu_model}
+Input rate: {args.rate / 1e3:g} kHz
+"""
+
+ds = r"""
+ITk Layout: 03-00-00, $t\bar{t}$, $\langle\mu\rangle = 200$, $\sqrt{s} = 14$ TeV
+ACTS-based, Fast
+"""
+
+axs[0].text(0.16, 0.52, s=s.strip(), transform=axs[0].transAxes)
+
+atlasify.atlasify(
+    axes=axs[0],
+    brand="ATLAS",
+    atlas="Simulation Internal",
+    subtext=ds.strip(),
+    enlarge=1.3,
+)
+
+ylim = axs[0].get_ylim()
+axs[0].set_ylim(0, ylim[1])
+
+if args.output is not None:
+    fig.savefig(args.output)
+
+if args.output is None or args.show:
+    plt.show()
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+
+import argparse
+import sys
+from pathlib import Path
+
+import matplotlib.pyplot as plt
+from matplotlib.ticker import NullFormatter, ScalarFormatter
+import numpy as np
+import pandas as pd
+import atlasify
+
+from common import colors, markers
+from scaling import (
+    SCALING_ALGORITHMS,
+    read_runs,
+    scaling_table,
+    summarize,
+    usl,
+)
+from spot import COMPONENTS, LABELS, read_cpu_models
+
+
+base_dir = Path(__file__).parent.parent
+ALGORITHM_LABELS = dict(
+    zip(COMPONENTS, LABELS),
+    ActsPixelSeedingAlg="Pixel seeding",
+    ActsStripSeedingAlg="Strip seeding",
+)
+
+parser = argparse.ArgumentParser(
+    description="Throughput, time inflation and memory against the thread count "
+    "of AthenaMT runs with Amdahl and USL fits"
+)
+parser.add_argument(
+    "runs",
+    nargs="+",
+    metavar="[THREADS[,SLOTS]=]PATH",
+    help="SPOT-style CSV or monitoring ROOT file of one or more runs, CSVs may "
+    "give the thread and slot counts in `threads` and `slots` columns",
+)
+parser.add_argument(
+    "--algorithm",
+    action="append",
+    help="Algorithm to analyse, repeat for several, default clusterization, "
+    "seeding and track finding",
+)
+parser.add_argument(
+    "--cpu-models",
+    type=Path,
+    default=base_dir / "data/capacity/cpu_models.csv",
+    help="CSV table with HS23 per core and cores per node for each CPU model",
+)
+parser.add_argument(
+    "--cpu-model",
+    help="CPU model whose node size is marked, defaults to the first in the table",
+)
+parser.add_argument(
+    "--table", type=Path, help="Path to output CSV with the fitted parameters"
+)
+parser.add_argument(
+    "--output",
+    type=Path,
+    help="Path to output file",
+)
+parser.add_argument("--show", action="store_true", help="Show plot")
+args = parser.parse_args()
+
+algorithms = args.algorithm or SCALING_ALGORITHMS
+
+cpu_models = read_cpu_models(args.cpu_models).set_index("cpu_model")
+cpu_model = args.cpu_model or cpu_models.index[0]
+if cpu_model not in cpu_models.index:
+    raise ValueError(f"Unknown CPU model: {cpu_model}")
+cores = int(cpu_models.loc[cpu_model, "cores_per_node"])
+
+runs = read_runs(args.runs)
+summary = summarize(runs, algorithms)
+missing = [a for a in algorithms if a not in summary.columns or summary[a].isna().all()]
+for algorithm in missing:
+    print(f"warning: {algorithm} is not timed in any run, skipped", file=sys.stderr)
+algorithms = [a for a in algorithms if a not in missing]
+table = scaling_table(summary, algorithms, cores=cores)
+
+with pd.option_context("display.width", 200, "display.float_format", "{:.4g}".format):
+    print(table.to_string(index=False))
+if args.table is not None:
+    table.to_csv(args.table, index=False)
+
+fits = table.set_index("algorithm")
+threads = summary["threads"].to_numpy(dtype=float)
+n = np.geomspace(1, max(threads.max(), cores) * 1.2, 200)
+
+atlasify.monkeypatch_axis_labels()
+
+fig, axs = plt.subplots(1, 3, figsize=(15, 4.5), dpi=200, layout="constrained")
+
+fit = fits.loc["Throughput"]
+axs[0].plot(
+    threads,
+    summary["throughput"],
+    linestyle="",
+    marker=markers[0],
+    color=colors[0],
+    label="Measured",
+)
+axs[0].plot(
+    n,
+    n / usl(n, fit["cost_1"], fit["sigma"], fit["kappa"]),
+    color=colors[0],
+    label=f"USL, $\\sigma$ = {fit['sigma']:.3f}, $\\kappa$ = {fit['kappa']:.1e}",
+)
+axs[0].plot(
+    n,
+    n / usl(n, fit["cost_1"], fit["amdahl_sigma"], 0),
+    color=colors[0],
+    linestyle=":",
+    label=f"Amdahl, $\\sigma$ = {fit['amdahl_sigma']:.3f}",
+)
+axs[0].plot(n, n / fit["cost_1"], color="gray", linestyle="--", label="Linear")
+axs[0].set_ylim(0, 1.5 * np.nanmax(summary["throughput"]))
+axs[0].set_ylabel("Throughput [events/s]")
+
+for i, algorithm in enumerate(algorithms):
+    fit = fits.loc[algorithm]
+    color, marker = colors[i % len(colors)], markers[i % len(markers)]
+    axs[1].plot(
+        threads,
+        summary[algorithm] / fit["cost_1"],
+        linestyle="",
+        marker=marker,
+        color=color,
+        label=f"{ALGORITHM_LABELS.get(algorithm, algorithm)}, "
+        f"50% at {fit['half_efficiency_threads']:.0f}",
+    )
+    axs[1].plot(n, usl(n, 1, fit["sigma"], fit["kappa"]), color=color)
+axs[1].axhline(2, color="gray", linestyle=":")
+axs[1].set_ylabel("Time per event / single thread")
+
+axs[2].plot(
+    threads,
+    summary["memory_per_thread"],
+    linestyle="",
+    marker=markers[0],
+    color=colors[0],
+)
+if summary["memory_per_thread"].notna().any():
+    axs[2].set_ylim(0, 1.5 * np.nanmax(summary["memory_per_thread"]))
+axs[2].set_ylabel("Memory per thread [MB]")
+
+for ax in axs:
+    ax.set_xscale("log", base=2)
+    ax.set_xlim(n[0] * 0.8, n[-1])
+    ax.axvline(cores, color="gray", linestyle="--")
+    ax.set_xlabel("Threads")
+
+axs[0].text(
+    cores,
+    axs[0].get_ylim()[1] * 0.03,
+    f" {cores} cores",
+    color="gray",
+    ha="left",
+    va="bottom",
+)
+axs[0].legend(loc="upper left", bbox_to_anchor=(0, 0.72), frameon=False)
+axs[1].legend(loc="upper left", frameon=False)
+
+atlasify.atlasify(
+    axes=axs[0],
+    brand="ATLAS",
+    atlas="Simulation Internal",
+    subtext=f"AthenaMT, {cpu_model}",
+)
+for ax in axs[1:]:
+    atlasify.atlasify(axes=ax, brand=None, atlas=None, subtext=None)
+for ax in axs:
+    ax.set_xticks(2 ** np.arange(int(np.log2(n[-1])) + 1))
+    ax.xaxis.set_major_formatter(ScalarFormatter())
+    ax.xaxis.set_minor_formatter(NullFormatter())
+
+if args.output is not None:
+    fig.savefig(args.output)
+
+if args.output is None or args.show:
+    plt.show()
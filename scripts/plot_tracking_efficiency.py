@@ -1,22 +1,83 @@
 #!/usr/bin/env python3
 
 import argparse
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import matplotlib.pyplot as plt
-import ROOT
-import atlasify
-
-from common import markers, colors, TH1, ratio_std
+import numpy as np
+
+from common import (
+    TH1,
+    TH1Stack,
+    labelled_input,
+    load_histograms,
+    palette,
+    stream_passed_total,
+)
+from figures import atlasify_main, atlasify_plain, ratio_figure
 
 
 base_dir = Path(__file__).parent.parent.parent
 
+# branch, axis label, default binning and log scale of the truth ntuple variables
+VARIABLES = {
+    "eta": ("truth_eta", "$\\eta$", np.linspace(-4, 4, 41), False),
+    "pt": ("truth_pt", "$p_T$ [GeV]", np.geomspace(1, 100, 21), True),
+    "d0": ("truth_d0", "$d_0$ [mm]", np.linspace(-2, 2, 41), False),
+    "mu": (
+        "actualInteractionsPerCrossing",
+        "$\\mu$",
+        np.linspace(150, 250, 21),
+        False,
+    ),
+}
+
+
+def parse_bins(spec, default, log=False):
+    """
+    Either a number of bins over the default range or comma separated edges.
+    """
+    if spec is None:
+        return default
+    if "," in spec:
+        return np.array(sorted(float(edge) for edge in spec.split(",")))
+    space = np.geomspace if log else np.linspace
+    return space(default[0], default[-1], int(spec) + 1)
+
+
 parser = argparse.ArgumentParser()
 parser.add_argument("input_athena_slow", type=Path)
 parser.add_argument("--input-acts-fast", type=Path)
 parser.add_argument("--input-acts-slow", type=Path)
 parser.add_argument("--input-acts-slow-analog", type=Path)
+parser.add_argument(
+    "--input",
+    action="append",
+    default=[],
+    metavar="LABEL=PATH",
+    help="Additional labelled input to compare, repeat for several",
+)
 parser.add_argument("mode", choices=["physics", "technical"])
+parser.add_argument(
+    "--ntuple",
+    action="store_true",
+    help="Inputs are IDTPM truth ntuples, recompute the efficiency with any binning",
+)
+parser.add_argument("--tree", default="TruthParticles", help="Tree of the ntuple")
+parser.add_argument("--vs", choices=list(VARIABLES), default="eta")
+parser.add_argument(
+    "--bins", help="Number of bins over the default range or comma separated edges"
+)
+parser.add_argument(
+    "--branch", help="Branch of the --vs variable, default depends on the variable"
+)
+parser.add_argument("--passed-branch", default="truth_isMatched")
+parser.add_argument(
+    "--technical-branch",
+    default="truth_isReconstructable",
+    help="Branch selecting the denominator of the technical efficiency",
+)
+parser.add_argument("--step-size", default="200 MB", help="Size of uproot chunks")
 parser.add_argument(
     "--output",
     type=Path,
@@ -25,18 +86,17 @@ parser.add_argument(
 parser.add_argument("--show", action="store_true", help="Show plot")
 args = parser.parse_args()
 
-input_athena_slow = ROOT.TFile.Open(args.input_athena_slow.as_posix())
-data_acts_fast = (
-    ROOT.TFile.Open(args.input_acts_fast.as_posix()) if args.input_acts_fast else None
-)
-data_acts_slow = (
-    ROOT.TFile.Open(args.input_acts_slow.as_posix()) if args.input_acts_slow else None
-)
-data_acts_slow_analog = (
-    ROOT.TFile.Open(args.input_acts_slow_analog.as_posix())
-    if args.input_acts_slow_analog
-    else None
-)
+inputs = [
+    ("Non-ACTS", args.input_athena_slow),
+    ("ACTS-based", args.input_acts_slow),
+    ("ACTS-based, Fast", args.input_acts_fast),
+    ("ACTS-based, Analog", args.input_acts_slow_analog),
+] + [labelled_input(spec) for spec in args.input]
+inputs = [
+    (label, path, style)
+    for (label, path), style in zip(inputs, palette(len(inputs)))
+    if path is not None
+]
 
 if args.mode == "physics":
     idtpm_path = "InDetTrackPerfMonPlots/TrkAnaEF_EFsel/Offline/Tracks/Efficiencies/eff_vs_truth_eta"
@@ -47,61 +107,58 @@ elif args.mode == "technical":
 else:
     raise ValueError("Invalid mode specified. Choose 'physics' or 'technical'.")
 
-eff_athena_slow = TH1(input_athena_slow.Get(idtpm_path), xrange=(-4, 4))
-eff_acts_fast = (
-    TH1(data_acts_fast.Get(idtpm_path), xrange=(-4, 4)) if data_acts_fast else None
-)
-eff_acts_slow = (
-    TH1(data_acts_slow.Get(idtpm_path), xrange=(-4, 4)) if data_acts_slow else None
-)
-eff_acts_slow_analog = (
-    TH1(data_acts_slow_analog.Get(idtpm_path), xrange=(-4, 4))
-    if data_acts_slow_analog
-    else None
-)
+if args.ntuple:
+    branch, xlabel, edges, log = VARIABLES[args.vs]
+    branch = args.branch or branch
+    edges = parse_bins(args.bins, edges, log)
+    selection = args.technical_branch if args.mode == "technical" else None
+
+    def load(path):
+        passed, total = stream_passed_total(
+            path,
+            args.tree,
+            branch,
+            args.passed_branch,
+            edges,
+            selection=selection,
+            step_size=args.step_size,
+        )
+        return TH1.from_efficiency(edges, passed, total)
+
+    with ThreadPoolExecutor() as executor:
+        effs = TH1Stack(list(executor.map(load, [path for _, path, _ in inputs])))
+    xlim = (edges[0], edges[-1])
+else:
+    log = False
+    effs = TH1Stack(
+        load_histograms([path for _, path, _ in inputs], idtpm_path, xrange=(-4, 4))
+    )
+    xlabel = "$\\eta$"
+    xlim = (-4, 4)
+ratio, ratio_err = effs.ratio()
 
-atlasify.monkeypatch_axis_labels()
+fig, axs = ratio_figure()
 
-fig, axs = plt.subplots(
-    2,
-    1,
-    figsize=(6, 4),
-    dpi=200,
-    sharex=True,
-    gridspec_kw={"height_ratios": [10, 4], "hspace": 0.02},
-    layout="constrained",
-)
-
-axs[0].set_xlim(-4, 4)
+axs[0].set_xlim(*xlim)
+if log:
+    axs[0].set_xscale("log")
 
 # axs[0].set_xlabel("$\\eta$")
 axs[0].set_ylabel(ylabel)
 
-axs[1].set_xlabel("$\\eta$")
+axs[1].set_xlabel(xlabel)
 axs[1].set_ylabel("ACTS / Non-ACTS")
 
-eff_athena_slow.errorbar(
-    axs[0], label="Non-ACTS", linestyle="", marker=markers[0], color=colors[0]
-)
-if eff_acts_slow is not None:
-    eff_acts_slow.errorbar(
-        axs[0], label="ACTS-based", linestyle="", marker=markers[1], color=colors[1]
-    )
-if eff_acts_fast is not None:
-    eff_acts_fast.errorbar(
-        axs[0],
-        label="ACTS-based, Fast",
-        linestyle="",
-        marker=markers[2],
-        color=colors[2],
-    )
-if eff_acts_slow_analog is not None:
-    eff_acts_slow_analog.errorbar(
-        axs[0],
-        label="ACTS-based, Analog",
+for i, (label, _, (marker, color)) in enumerate(inputs):
+    axs[0].errorbar(
+        effs.x,
+        effs.y[i],
+        yerr=(effs.y_err_lo[i], effs.y_err_hi[i]),
+        xerr=(effs.x_err_lo, effs.x_err_hi),
+        label=label,
         linestyle="",
-        marker=markers[3],
-        color=colors[3],
+        marker=marker,
+        color=color,
     )
 
 axs[0].legend()
@@ -113,73 +170,27 @@ ITk Layout: 03-00-00
 ACTS v43.0.1, Athena 25.0.40
 """.strip()
 
-atlasify.atlasify(
-    axes=axs[0],
-    brand="ATLAS",
-    atlas="Simulation Preliminary",
-    subtext=subtext,
-    enlarge=2.0,
-)
+atlasify_main(axs[0], subtext=subtext, enlarge=2.0)
 
 axs[1].hlines(
     1,
-    xmin=eff_athena_slow.x[0],
-    xmax=eff_athena_slow.x[-1],
-    color=colors[0],
+    xmin=effs.x[0],
+    xmax=effs.x[-1],
+    color=inputs[0][2][1],
     linestyle="--",
 )
-if eff_acts_slow is not None:
-    axs[1].errorbar(
-        eff_acts_slow.x,
-        eff_acts_slow.y / eff_athena_slow.y,
-        yerr=ratio_std(
-            eff_acts_slow.y,
-            eff_athena_slow.y,
-            0.5 * (eff_acts_slow.y_err_hi - eff_acts_slow.y_err_lo),
-            0.5 * (eff_athena_slow.y_err_hi - eff_athena_slow.y_err_lo),
-        ),
-        xerr=(eff_acts_slow.x_err_lo, eff_acts_slow.x_err_hi),
-        linestyle="",
-        marker=markers[1],
-        color=colors[1],
-    )
-if eff_acts_fast is not None:
+for i, (_, _, (marker, color)) in enumerate(inputs[1:], start=1):
     axs[1].errorbar(
-        eff_acts_fast.x,
-        eff_acts_fast.y / eff_athena_slow.y,
-        yerr=ratio_std(
-            eff_acts_fast.y,
-            eff_athena_slow.y,
-            0.5 * (eff_acts_fast.y_err_hi - eff_acts_fast.y_err_lo),
-            0.5 * (eff_athena_slow.y_err_hi - eff_athena_slow.y_err_lo),
-        ),
-        xerr=(eff_acts_fast.x_err_lo, eff_acts_fast.x_err_hi),
+        effs.x,
+        ratio[i],
+        yerr=ratio_err[i],
+        xerr=(effs.x_err_lo, effs.x_err_hi),
         linestyle="",
-        marker=markers[2],
-        color=colors[2],
-    )
-if eff_acts_slow_analog is not None:
-    axs[1].errorbar(
-        eff_acts_slow_analog.x,
-        eff_acts_slow_analog.y / eff_athena_slow.y,
-        yerr=ratio_std(
-            eff_acts_slow_analog.y,
-            eff_athena_slow.y,
-            0.5 * (eff_acts_slow_analog.y_err_hi - eff_acts_slow_analog.y_err_lo),
-            0.5 * (eff_athena_slow.y_err_hi - eff_athena_slow.y_err_lo),
-        ),
-        xerr=(eff_acts_slow_analog.x_err_lo, eff_acts_slow_analog.x_err_hi),
-        linestyle="",
-        marker=markers[3],
-        color=colors[3],
+        marker=marker,
+        color=color,
     )
 
-atlasify.atlasify(
-    axes=axs[1],
-    brand=None,
-    atlas=None,
-    subtext=None,
-)
+atlasify_plain(axs[1])
 
 if args.output is not None:
     fig.savefig(args.output)
@@ -3,11 +3,9 @@
 import argparse
 from pathlib import Path
 import matplotlib.pyplot as plt
-import numpy as np
-import ROOT
-import atlasify
 
-from common import markers, colors, TH1, ratio_std
+from common import TH1Stack, labelled_input, load_histograms, palette
+from figures import atlasify_plain, ratio_figure
 
 
 markersize = 3
@@ -20,6 +18,13 @@ parser.add_argument("input_athena_slow", type=Path)
 parser.add_argument("--input-acts-fast", type=Path)
 parser.add_argument("--input-acts-slow", type=Path)
 parser.add_argument("--input-acts-slow-analog", type=Path)
+parser.add_argument(
+    "--input",
+    action="append",
+    default=[],
+    metavar="LABEL=PATH",
+    help="Additional labelled input to compare, repeat for several",
+)
 parser.add_argument("mode", choices=["pixel_inner", "pixel", "strip"])
 parser.add_argument(
     "--output",
@@ -29,18 +34,17 @@ parser.add_argument(
 parser.add_argument("--show", action="store_true", help="Show plot")
 args = parser.parse_args()
 
-data_athena_slow = ROOT.TFile.Open(args.input_athena_slow.as_posix())
-data_acts_fast = (
-    ROOT.TFile.Open(args.input_acts_fast.as_posix()) if args.input_acts_fast else None
-)
-data_acts_slow = (
-    ROOT.TFile.Open(args.input_acts_slow.as_posix()) if args.input_acts_slow else None
-)
-data_acts_slow_analog = (
-    ROOT.TFile.Open(args.input_acts_slow_analog.as_posix())
-    if args.input_acts_slow_analog
-    else None
-)
+inputs = [
+    ("Non-ACTS", args.input_athena_slow),
+    ("ACTS-based", args.input_acts_slow),
+    ("ACTS-based, Fast", args.input_acts_fast),
+    ("ACTS-based, Analog", args.input_acts_slow_analog),
+] + [labelled_input(spec) for spec in args.input]
+inputs = [
+    (label, path, style)
+    for (label, path), style in zip(inputs, palette(len(inputs)))
+    if path is not None
+]
 
 if args.mode == "pixel_inner":
     idtpm_path = "InDetTrackPerfMonPlots/TrkAnaEF_EFsel/Offline/Tracks/HitsOnTracks/offl_nInnerMostPixelHits_vs_offl_eta"
@@ -54,30 +58,12 @@ elif args.mode == "strip":
 else:
     raise ValueError("Invalid mode specified")
 
-eff_athena_slow = TH1(data_athena_slow.Get(idtpm_path), xrange=(-4, 4))
-eff_acts_fast = (
-    TH1(data_acts_fast.Get(idtpm_path), xrange=(-4, 4)) if data_acts_fast else None
-)
-eff_acts_slow = (
-    TH1(data_acts_slow.Get(idtpm_path), xrange=(-4, 4)) if data_acts_slow else None
-)
-eff_acts_slow_analog = (
-    TH1(data_acts_slow_analog.Get(idtpm_path), xrange=(-4, 4))
-    if data_acts_slow_analog
-    else None
+effs = TH1Stack(
+    load_histograms([path for _, path, _ in inputs], idtpm_path, xrange=(-4, 4))
 )
+ratio, ratio_err = effs.ratio(min_reference=0.1)
 
-atlasify.monkeypatch_axis_labels()
-
-fig, axs = plt.subplots(
-    2,
-    1,
-    figsize=(6, 4),
-    dpi=200,
-    sharex=True,
-    gridspec_kw={"height_ratios": [10, 4], "hspace": 0.05},
-    layout="constrained",
-)
+fig, axs = ratio_figure(hspace=0.05)
 
 axs[0].set_xlim(-4, 4)
 
@@ -87,50 +73,22 @@ axs[0].set_ylabel(ylabel)
 axs[1].set_xlabel("$\\eta$")
 axs[1].set_ylabel("ACTS / Non-ACTS")
 
-eff_athena_slow.errorbar(
-    axs[0],
-    label="Non-ACTS",
-    linestyle="",
-    color=colors[0],
-    marker=markers[0],
-    markersize=markersize,
-)
-if eff_acts_slow is not None:
-    eff_acts_slow.errorbar(
-        axs[0],
-        label="ACTS-based",
+for i, (label, _, (marker, color)) in enumerate(inputs):
+    axs[0].errorbar(
+        effs.x,
+        effs.y[i],
+        yerr=(effs.y_err_lo[i], effs.y_err_hi[i]),
+        xerr=(effs.x_err_lo, effs.x_err_hi),
+        label=label,
         linestyle="",
-        color=colors[1],
-        marker=markers[1],
-        markersize=markersize,
-    )
-if eff_acts_fast is not None:
-    eff_acts_fast.errorbar(
-        axs[0],
-        label="ACTS-based, Fast",
-        linestyle="",
-        color=colors[2],
-        marker=markers[2],
-        markersize=markersize,
-    )
-if eff_acts_slow_analog is not None:
-    eff_acts_slow_analog.errorbar(
-        axs[0],
-        label="ACTS-based, Analog",
-        linestyle="",
-        color=colors[3],
-        marker=markers[3],
+        color=color,
+        marker=marker,
         markersize=markersize,
     )
 
 axs[0].legend()
 
-atlasify.atlasify(
-    axes=axs[0],
-    brand=None,
-    atlas=None,
-    subtext=None,
-)
+atlasify_plain(axs[0])
 
 # axs[1].errorbar(
 #     eff_athena.x,
@@ -143,71 +101,25 @@ atlasify.atlasify(
 # )
 axs[1].hlines(
     1,
-    xmin=eff_athena_slow.x[0],
-    xmax=eff_athena_slow.x[-1],
-    color=colors[0],
+    xmin=effs.x[0],
+    xmax=effs.x[-1],
+    color=inputs[0][2][1],
     linestyle="--",
 )
-divisor = np.copy(eff_athena_slow.y)
-divisor[divisor < 0.1] = float("nan")
-if eff_acts_slow is not None:
-    axs[1].errorbar(
-        eff_acts_slow.x,
-        eff_acts_slow.y / divisor,
-        yerr=ratio_std(
-            eff_acts_slow.y,
-            eff_athena_slow.y,
-            0.5 * (eff_acts_slow.y_err_hi - eff_acts_slow.y_err_lo),
-            0.5 * (eff_athena_slow.y_err_hi - eff_athena_slow.y_err_lo),
-        ),
-        xerr=(eff_acts_slow.x_err_lo, eff_acts_slow.x_err_hi),
-        linestyle="",
-        color=colors[1],
-        marker=markers[1],
-        markersize=markersize,
-        alpha=0.5,
-    )
-if eff_acts_fast is not None:
+for i, (_, _, (marker, color)) in enumerate(inputs[1:], start=1):
     axs[1].errorbar(
-        eff_acts_fast.x,
-        eff_acts_fast.y / divisor,
-        yerr=ratio_std(
-            eff_acts_fast.y,
-            eff_athena_slow.y,
-            0.5 * (eff_acts_fast.y_err_hi - eff_acts_fast.y_err_lo),
-            0.5 * (eff_athena_slow.y_err_hi - eff_athena_slow.y_err_lo),
-        ),
-        xerr=(eff_acts_fast.x_err_lo, eff_acts_fast.x_err_hi),
+        effs.x,
+        ratio[i],
+        yerr=ratio_err[i],
+        xerr=(effs.x_err_lo, effs.x_err_hi),
         linestyle="",
-        color=colors[2],
-        marker=markers[2],
-        markersize=markersize,
-        alpha=0.5,
-    )
-if eff_acts_slow_analog is not None:
-    axs[1].errorbar(
-        eff_acts_slow_analog.x,
-        eff_acts_slow_analog.y / divisor,
-        yerr=ratio_std(
-            eff_acts_slow_analog.y,
-            eff_athena_slow.y,
-            0.5 * (eff_acts_slow_analog.y_err_hi - eff_acts_slow_analog.y_err_lo),
-            0.5 * (eff_athena_slow.y_err_hi - eff_athena_slow.y_err_lo),
-        ),
-        xerr=(eff_acts_slow_analog.x_err_lo, eff_acts_slow_analog.x_err_hi),
-        linestyle="",
-        color=colors[3],
-        marker=markers[3],
+        color=color,
+        marker=marker,
         markersize=markersize,
         alpha=0.5,
     )
 
-atlasify.atlasify(
-    axes=axs[1],
-    brand=None,
-    atlas=None,
-    subtext=None,
-)
+atlasify_plain(axs[1])
 
 if args.output is not None:
     fig.savefig(args.output)
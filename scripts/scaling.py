@@ -0,0 +1,256 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from spot import COMPONENTS
+
+
+# TIME_execute of the monitoring trees is in microseconds
+MONITORING_TIME_UNIT = 1e-6
+# algorithms whose scaling is of interest, in the order they are reported
+SCALING_ALGORITHMS = [
+    "ActsPixelClusterizationAlg",
+    "ActsStripClusterizationAlg",
+    "ActsPixelSeedingAlg",
+    "ActsTrackFindingAlg",
+]
+
+
+def parse_run(spec):
+    """
+    Parse a run specification of the form `[threads[,slots]=]path`.
+
+    Without a thread count the file must have `threads` and optionally `slots`
+    columns. Without a slot count the run had as many slots as threads.
+
+    Returns:
+    (int, int, Path): Threads, slots and path, the counts may be `None`.
+    """
+    if "=" not in spec:
+        return None, None, Path(spec)
+    counts, path = spec.split("=", 1)
+    threads, *slots = counts.split(",")
+    if len(slots) > 1:
+        raise ValueError(f"Invalid run specification: {spec}")
+    threads = int(threads)
+    return threads, int(slots[0]) if slots else threads, Path(path)
+
+
+def read_monitoring_run(path):
+    """
+    Summarize a monitoring file as one run: the robust mean time per event of
+    every algorithm with a `TimeVsClusters` tree and the number of events.
+
+    Monitoring files have no wall time, so the throughput of the run is left
+    to `throughput`, which estimates it from the algorithm times.
+    """
+    import uproot
+
+    from common import robust_mean
+
+    run = {}
+    n_events = 0
+    with uproot.open(path) as file:
+        for key in file.keys(cycle=False):
+            if not key.endswith("/TimeVsClusters"):
+                continue
+            algorithm = key.split("/")[0]
+            if algorithm in run:
+                # tool trees below an algorithm only resolve part of its time
+                continue
+            time = file[key].arrays(["TIME_execute"], library="np")["TIME_execute"]
+            run[algorithm] = robust_mean(time) * MONITORING_TIME_UNIT
+            n_events = max(n_events, len(time))
+    run["num_events"] = n_events
+    return pd.DataFrame([run])
+
+
+def read_runs(specs):
+    """
+    Read SPOT-style CSVs and monitoring files into one table with a row per run
+    and `threads` and `slots` columns.
+
+    CSV rows are runs with per-event algorithm times in seconds, as in SPOT,
+    and optionally `wall_time` in seconds for the event loop and `rss_mb` for
+    the peak resident memory of the job.
+    """
+    frames = []
+    for spec in specs:
+        threads, slots, path = parse_run(spec)
+        if path.suffix == ".root":
+            df = read_monitoring_run(path)
+        else:
+            df = pd.read_csv(path)
+        if threads is not None:
+            df["threads"] = threads
+            df["slots"] = slots
+        elif "threads" not in df.columns:
+            raise ValueError(f"{path} has no threads column, give them as N={path}")
+        if "slots" not in df.columns:
+            df["slots"] = df["threads"]
+        df["slots"] = df["slots"].fillna(df["threads"])
+        df["source"] = str(path)
+        frames.append(df)
+    return pd.concat(frames, ignore_index=True)
+
+
+def throughput(runs, algorithms=COMPONENTS):
+    """
+    Events per second of every run. Runs without a wall time are assumed to
+    keep all slots busy with the given algorithms, which is an upper bound.
+    """
+    algorithms = [a for a in algorithms if a in runs.columns]
+    busy = runs[algorithms].sum(axis=1)
+    estimate = runs["slots"] / busy.where(busy > 0)
+    if "wall_time" not in runs.columns:
+        return estimate
+    return (runs["num_events"] / runs["wall_time"]).fillna(estimate)
+
+
+def memory_per_thread(runs):
+    """
+    Peak resident memory per thread in MB. Without `rss_mb` the sum of the
+    `avg_mem_*` columns of SPOT, which are in kB, stands in for it.
+    """
+    if "rss_mb" in runs.columns:
+        rss = runs["rss_mb"]
+    else:
+        columns = [c for c in runs.columns if c.startswith("avg_mem_")]
+        if not columns:
+            return pd.Series(np.nan, index=runs.index)
+        rss = runs[columns].sum(axis=1) / 1024
+    return rss / runs["threads"]
+
+
+def summarize(runs, algorithms=COMPONENTS):
+    """
+    Median over repeated runs per thread and slot count of the throughput,
+    the memory per thread and the time per event of every algorithm.
+    """
+    algorithms = [a for a in algorithms if a in runs.columns]
+    df = runs[["threads", "slots"] + algorithms].copy()
+    df["throughput"] = throughput(runs, algorithms)
+    df["memory_per_thread"] = memory_per_thread(runs)
+    # algorithms which did not run are not timed as zero
+    df[algorithms] = df[algorithms].where(df[algorithms] > 0)
+    return df.groupby(["threads", "slots"], as_index=False).median()
+
+
+def usl(threads, scale, sigma, kappa):
+    """
+    Cost per event of the Universal Scalability Law at `threads`, `scale` at
+    one thread. Broadcasts over the parameters, `kappa = 0` is Amdahl's law.
+    """
+    n = np.asarray(threads, dtype=float)
+    return scale * (1 + sigma * (n - 1) + kappa * n * (n - 1))
+
+
+def fit_usl(threads, cost, amdahl=False):
+    """
+    Fit the Universal Scalability Law to the cost per event of several series
+    at once, e.g. the time per event of every algorithm or threads divided by
+    the throughput. The model is linear in its coefficients, so all series are
+    solved with one batched weighted least squares in which missing points
+    have no weight. Series with fewer than three points or a negative
+    coherency `kappa` are fitted with Amdahl's law instead. Series with a
+    negative contention `sigma` do not scale measurably: their `sigma` and
+    `kappa` are set to zero and the cost at one thread to their mean cost.
+
+    Parameters:
+    threads (array): Thread counts with shape (point,).
+    cost (array): Cost per event with shape (point, series), may be NaN.
+    amdahl (bool): Fit Amdahl's law, `kappa = 0`.
+
+    Returns:
+    (array, array, array): Cost at one thread, sigma and kappa per series.
+    """
+    n = np.asarray(threads, dtype=float)
+    cost = np.asarray(cost, dtype=float).reshape(len(n), -1)
+    weights = np.isfinite(cost).astype(float)
+    y = np.nan_to_num(cost)
+
+    def solve(design):
+        normal = np.einsum("pi,ps,pj->sij", design, weights, design)
+        rhs = np.einsum("pi,ps,ps->si", design, weights, y)
+        return np.einsum("sij,sj->si", np.linalg.pinv(normal), rhs)
+
+    amdahl_coef = solve(np.stack([np.ones_like(n), n - 1], axis=-1))
+    coef = np.concatenate([amdahl_coef, np.zeros((len(amdahl_coef), 1))], axis=-1)
+    if not amdahl:
+        usl_coef = solve(np.stack([np.ones_like(n), n - 1, n * (n - 1)], axis=-1))
+        # two points do not constrain three coefficients
+        determined = weights.sum(axis=0)[:, None] >= 3
+        coef = np.where(determined & (usl_coef[:, 2:] >= 0), usl_coef, coef)
+
+    contended = coef[:, 1] < 0
+    coef[contended, 1:] = 0
+    coef[contended, 0] = (weights * y).sum(axis=0)[contended] / np.maximum(
+        weights.sum(axis=0)[contended], 1
+    )
+
+    scale, a, b = coef.T
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return scale, a / scale, b / scale
+
+
+def peak_threads(sigma, kappa):
+    """
+    Thread count with the highest throughput, infinite without coherency cost.
+    """
+    sigma, kappa = np.asarray(sigma, dtype=float), np.asarray(kappa, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(kappa > 0, np.sqrt(np.clip(1 - sigma, 0, None) / kappa), np.inf)
+
+
+def half_efficiency_threads(sigma, kappa):
+    """
+    Thread count at which the cost per event has doubled, i.e. every added
+    thread is only half used. Solves `sigma (n-1) + kappa n (n-1) = 1`.
+    """
+    sigma, kappa = np.asarray(sigma, dtype=float), np.asarray(kappa, dtype=float)
+    b = sigma - kappa
+    with np.errstate(divide="ignore", invalid="ignore"):
+        quadratic = (-b + np.sqrt(b**2 + 4 * kappa * (1 + sigma))) / (2 * kappa)
+        linear = 1 + 1 / sigma
+    return np.where(kappa > 0, quadratic, linear)
+
+
+def scaling_table(summary, algorithms=COMPONENTS, cores=None):
+    """
+    USL and Amdahl fits of the throughput and of the time per event of every
+    algorithm against the thread count.
+
+    Parameters:
+    summary (pd.DataFrame): Output of `summarize`.
+    algorithms (list of str): Algorithms to fit.
+    cores (int): Cores of a node, adds the efficiency at a full node.
+
+    Returns:
+    pd.DataFrame: One row per algorithm and `Throughput` with the fitted cost
+    at one thread, sigma and kappa of both models, the thread count of the
+    peak throughput and at which the efficiency has dropped to 50%.
+    """
+    algorithms = [a for a in algorithms if a in summary.columns]
+    threads = summary["threads"].to_numpy(dtype=float)
+    cost = np.column_stack(
+        [summary[algorithms].to_numpy(dtype=float), threads / summary["throughput"]]
+    )
+    names = algorithms + ["Throughput"]
+
+    scale, sigma, kappa = fit_usl(threads, cost)
+    _, amdahl_sigma, _ = fit_usl(threads, cost, amdahl=True)
+    table = pd.DataFrame(
+        {
+            "algorithm": names,
+            "cost_1": scale,
+            "sigma": sigma,
+            "kappa": kappa,
+            "amdahl_sigma": amdahl_sigma,
+            "peak_threads": peak_threads(sigma, kappa),
+            "half_efficiency_threads": half_efficiency_threads(sigma, kappa),
+        }
+    )
+    if cores is not None:
+        table["node_efficiency"] = 1 / usl(cores, 1, sigma, kappa)
+    return table
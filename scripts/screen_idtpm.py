@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import numpy as np
+import pandas as pd
+import scipy.special
+import scipy.stats
+import uproot
+
+
+def strip_cycle(key):
+    return key.rsplit(";", 1)[0]
+
+
+def list_histograms(file, prefix):
+    return {
+        strip_cycle(key): classname
+        for key, classname in file.classnames().items()
+        if key.startswith(prefix)
+        and (
+            classname.startswith(("TH1", "TH2", "TProfile"))
+            or classname == "TEfficiency"
+        )
+    }
+
+
+def read_histogram(file, key, classname):
+    """
+    Return the flattened values and errors of a histogram and whether the values
+    are counts, i.e. whether the shapes should be compared after normalization.
+    """
+    obj = file[key]
+    if classname == "TEfficiency":
+        passed = obj.member("fPassedHistogram").values(flow=False).ravel()
+        total = obj.member("fTotalHistogram").values(flow=False).ravel()
+        with np.errstate(divide="ignore", invalid="ignore"):
+            eff = np.where(total > 0, passed / total, 0)
+            err = np.where(total > 0, np.sqrt(eff * (1 - eff) / total), 0)
+        return eff, err, False
+    values = obj.values(flow=False).ravel()
+    errors = obj.errors(flow=False).ravel()
+    return values, errors, not classname.startswith("TProfile")
+
+
+def compare(a, ea, b, eb, normalize):
+    """
+    Vectorized compatibility tests of histogram pairs with the same number of
+    bins, all arrays have shape (pair, bin).
+
+    Shapes are compared for counts and values otherwise. Returns a dict of
+    arrays with one entry per pair.
+    """
+    if normalize:
+        na = a.sum(axis=1, keepdims=True)
+        nb = b.sum(axis=1, keepdims=True)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            a, ea = a / na, ea / na
+            b, eb = b / nb, eb / nb
+
+    var = ea**2 + eb**2
+    used = var > 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pull = np.where(used, (a - b) / np.sqrt(var), 0)
+        rel = np.where(used & (b != 0), np.abs(a / b - 1), 0)
+    chi2 = (pull**2).sum(axis=1)
+    ndf = used.sum(axis=1) - (1 if normalize else 0)
+    chi2_p = np.where(ndf > 0, scipy.stats.chi2.sf(chi2, np.maximum(ndf, 1)), 1)
+
+    if normalize:
+        # effective number of entries of weighted histograms
+        with np.errstate(divide="ignore", invalid="ignore"):
+            n_eff_a = np.nan_to_num(1 / (ea**2).sum(axis=1))
+            n_eff_b = np.nan_to_num(1 / (eb**2).sum(axis=1))
+            n_eff = n_eff_a * n_eff_b / (n_eff_a + n_eff_b)
+        ks = np.abs(np.cumsum(a, axis=1) - np.cumsum(b, axis=1)).max(axis=1)
+        ks_p = scipy.special.kolmogorov(np.sqrt(np.nan_to_num(n_eff)) * ks)
+    else:
+        ks = np.full(len(a), np.nan)
+        ks_p = np.full(len(a), np.nan)
+
+    return {
+        "chi2": chi2,
+        "ndf": ndf,
+        "chi2_p": chi2_p,
+        "ks": ks,
+        "ks_p": ks_p,
+        "max_pull": np.abs(pull).max(axis=1, initial=0),
+        "max_rel_dev": rel.max(axis=1, initial=0),
+    }
+
+
+def screen(path_a, path_b, keys):
+    file_a, file_b = uproot.open(path_a), uproot.open(path_b)
+
+    groups = {}
+    skipped = []
+    for key, classname in keys:
+        try:
+            a, ea, normalize = read_histogram(file_a, key, classname)
+            b, eb, _ = read_histogram(file_b, key, classname)
+        except Exception as e:
+            skipped.append((key, classname, str(e)))
+            continue
+        if a.shape != b.shape:
+            skipped.append((key, classname, f"binning differs: {a.shape} {b.shape}"))
+            continue
+        groups.setdefault((a.size, normalize), []).append(
+            (key, classname, a, ea, b, eb)
+        )
+
+    records = []
+    for (_, normalize), group in groups.items():
+        a, ea, b, eb = (np.stack([item[i] for item in group]) for i in range(2, 6))
+        result = compare(a, ea, b, eb, normalize)
+        for i, (key, classname, *_) in enumerate(group):
+            records.append(
+                {"path": key, "class": classname}
+                | {name: values[i] for name, values in result.items()}
+            )
+
+    return records, skipped
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "input_a", type=Path, help="IDTPM file, e.g. the ACTS-based one"
+    )
+    parser.add_argument("input_b", type=Path, help="IDTPM file to compare against")
+    parser.add_argument(
+        "--prefix",
+        default="InDetTrackPerfMonPlots/TrkAnaEF_EFsel",
+        help="Only screen histograms below this directory",
+    )
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument(
+        "--top", type=int, default=30, help="Number of entries to print"
+    )
+    parser.add_argument("--output", type=Path, help="Path to output CSV report")
+    args = parser.parse_args()
+
+    histograms_a = list_histograms(uproot.open(args.input_a), args.prefix)
+    histograms_b = list_histograms(uproot.open(args.input_b), args.prefix)
+    shared_paths = sorted(
+        (key, classname)
+        for key, classname in histograms_a.items()
+        if histograms_b.get(key) == classname
+    )
+    print(
+        f"{len(shared_paths)} common histograms,",
+        f"{len(histograms_a) - len(shared_paths)} only in {args.input_a.name},",
+        f"{len(histograms_b) - len(shared_paths)} only in {args.input_b.name}",
+    )
+
+    workers = args.workers or os.cpu_count()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        n_chunks = 4 * workers
+        chunks = [
+            shared_paths[i::n_chunks]
+            for i in range(n_chunks)
+            if shared_paths[i::n_chunks]
+        ]
+        results = list(
+            executor.map(
+                screen,
+                [args.input_a] * len(chunks),
+                [args.input_b] * len(chunks),
+                chunks,
+            )
+        )
+
+    records = [record for chunk, _ in results for record in chunk]
+    skipped = [item for _, chunk in results for item in chunk]
+    for key, classname, reason in skipped:
+        print("skipped", key, classname, reason)
+
+    if len(records) == 0:
+        raise ValueError("No comparable histograms found")
+
+    report = pd.DataFrame.from_records(records)
+    report["p"] = report[["chi2_p", "ks_p"]].min(axis=1)
+    report = report.sort_values(["p", "max_pull"], ascending=[True, False])
+
+    with pd.option_context("display.width", 200, "display.max_colwidth", 80):
+        print(report.head(args.top).to_string(index=False))
+
+    if args.output is not None:
+        report.to_csv(args.output, index=False)
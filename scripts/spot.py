@@ -0,0 +1,218 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+CATEGORY_PREFIX = "spot-mon-phase2_recoonly_"
+
+# (category, window start, window end), ordered from highest to lowest priority
+DEFAULT_CATEGORIES = [
+    ("spot-mon-phase2_recoonly_actsfasttracking", None, None),
+    ("spot-mon-phase2_recoonly_actstracking", "2024-07-12", None),
+]
+
+COMPONENTS = [
+    "ActsTrackFindingAlg",
+    "ActsPixelSeedingAlg",
+    "ActsPixelClusterizationAlg",
+    "ActsStripClusterizationAlg",
+    "ActsAmbiguityResolutionAlg",
+]
+
+LABELS = [
+    "Track finding",
+    "Pixel seeding",
+    "Pixel clusterization",
+    "Strip clusterization",
+    "Ambiguity resolution",
+]
+
+# SPOT runs on this machine, timings are per event on a single core
+REFERENCE_CPU = "Intel(R) Xeon(R) Gold 6326"
+REFERENCE_HS23 = 27
+
+
+def category_label(category):
+    return category.removeprefix(CATEGORY_PREFIX)
+
+
+def category_path(input_folder, category):
+    return Path(input_folder) / f"cern_results_{category}.csv"
+
+
+def parse_category(spec):
+    """
+    Parse a category specification of the form `name[,start[,end]]`.
+
+    Empty start or end fields leave the window open on that side.
+    """
+    name, *window = spec.split(",")
+    if len(window) > 2:
+        raise ValueError(f"Invalid category specification: {spec}")
+    window += [None] * (2 - len(window))
+    start, end = (w if w else None for w in window)
+    return name, start, end
+
+
+def read_results(source):
+    df = pd.read_csv(source)
+    df["build_date"] = pd.to_datetime(df["build_date"])
+    return df
+
+
+def read_category(input_folder, category):
+    return read_results(category_path(input_folder, category))
+
+
+def stitch(frames, windows=None):
+    """
+    Stitch several SPOT categories into one time series.
+
+    Parameters:
+    frames (list of (str, pd.DataFrame)): Categories and their results, ordered
+        from highest to lowest priority.
+    windows (list of (start, end)): Optional date window per category. `None`
+        leaves the window open on that side.
+
+    Each category claims the span between its first and last build inside its
+    window. A build is kept only if no higher priority category claims its date,
+    so lower priority categories fill in before and after the preferred ones.
+
+    Returns:
+    pd.DataFrame: The stitched results indexed and sorted by build date, with a
+    `source` column recording the category that supplied each build.
+    """
+    if windows is None:
+        windows = [(None, None)] * len(frames)
+    if len(windows) != len(frames):
+        raise ValueError("Need exactly one window per category")
+
+    df = pd.concat(
+        [frame.assign(source=name) for name, frame in frames], ignore_index=True
+    )
+    dates = df["build_date"].to_numpy()
+    priority = np.repeat(np.arange(len(frames)), [len(frame) for _, frame in frames])
+
+    inside = np.ones(len(df), dtype=bool)
+    spans = []
+    for i, (start, end) in enumerate(windows):
+        own = priority == i
+        if start is not None:
+            inside[own] &= dates[own] >= np.datetime64(pd.Timestamp(start))
+        if end is not None:
+            inside[own] &= dates[own] <= np.datetime64(pd.Timestamp(end))
+        claimed = dates[own & inside]
+        spans.append((claimed.min(), claimed.max()) if len(claimed) else None)
+
+    # priority of the first category claiming each date, len(frames) if unclaimed
+    owner = np.full(len(df), len(frames))
+    for i, span in reversed(list(enumerate(spans))):
+        if span is not None:
+            owner[(dates >= span[0]) & (dates <= span[1])] = i
+
+    df = df[inside & (priority <= owner)]
+    df = df.sort_values(by="build_date", kind="stable")
+    df.index = df["build_date"]
+    return df
+
+
+def load(input_folder, categories=DEFAULT_CATEGORIES, results=None):
+    """
+    Read and stitch the given categories.
+
+    `results` may map category names to already ingested results, for example
+    from `spot_fetch.fetch`, which are then used instead of reading the CSVs.
+    """
+    results = results or {}
+    frames = [
+        (name, results[name] if name in results else read_category(input_folder, name))
+        for name, _, _ in categories
+    ]
+    windows = [(start, end) for _, start, end in categories]
+    return stitch(frames, windows)
+
+
+def segments(df):
+    """
+    Split a stitched time series into contiguous runs of the same source.
+
+    Returns:
+    list of (str, pd.Timestamp, pd.Timestamp): Source, first and last build date.
+    """
+    source = df["source"].to_numpy()
+    dates = df["build_date"].to_numpy()
+    if len(source) == 0:
+        return []
+    starts = np.flatnonzero(np.r_[True, source[1:] != source[:-1]])
+    ends = np.r_[starts[1:] - 1, len(source) - 1]
+    return [
+        (source[s], pd.Timestamp(dates[s]), pd.Timestamp(dates[e]))
+        for s, e in zip(starts, ends)
+    ]
+
+
+def read_cpu_models(path):
+    """
+    Read a CPU model table with `cpu_model`, `hs23_per_core` and `cores_per_node`
+    columns.
+    """
+    df = pd.read_csv(path, comment="#")
+    missing = {"cpu_model", "hs23_per_core", "cores_per_node"} - set(df.columns)
+    if missing:
+        raise ValueError(f"CPU model table {path} misses columns: {sorted(missing)}")
+    return df
+
+
+def capacity(df, cpu_models, components=COMPONENTS, rate=1e6, budget=None):
+    """
+    Project SPOT timings onto farm capacity.
+
+    Parameters:
+    df (pd.DataFrame): SPOT results with per-event times in seconds on the
+        reference CPU.
+    cpu_models (pd.DataFrame): CPU model table, see `read_cpu_models`.
+    components (list of str): Algorithms to project, the total is added as `Total`.
+    rate (float): Target input rate in Hz.
+    budget (float): Available farm capacity in HS23, optional.
+
+    Returns:
+    pd.DataFrame: One row per nightly, algorithm and CPU model with the work per
+    event in HS23 s, events per second per core and per node, the HS23 and
+    number of nodes needed at the target rate and, if a budget is given, the
+    headroom as a fraction of the budget. Algorithms without recorded time in
+    a nightly, e.g. after being merged into another one, have no rows.
+    """
+    work = df[components].to_numpy(dtype=float) * REFERENCE_HS23
+    work = np.where(work > 0, work, np.nan)
+    total = np.nansum(work, axis=1, keepdims=True)
+    work = np.concatenate([work, np.where(total > 0, total, np.nan)], axis=1)
+    algorithms = list(components) + ["Total"]
+
+    hs23 = cpu_models["hs23_per_core"].to_numpy(dtype=float)
+    cores = cpu_models["cores_per_node"].to_numpy(dtype=float)
+
+    # (nightly, algorithm, cpu model)
+    work = np.broadcast_to(work[:, :, None], work.shape + (len(cpu_models),))
+    per_core = hs23 / work
+    per_node = per_core * cores
+    required = work * rate
+    nodes = np.ceil(required / (hs23 * cores))
+
+    index = pd.MultiIndex.from_product(
+        [df["build_date"], algorithms, cpu_models["cpu_model"]],
+        names=["build_date", "algorithm", "cpu_model"],
+    )
+    result = pd.DataFrame(
+        {
+            "hs23_s": work.ravel(),
+            "events_per_s_core": per_core.ravel(),
+            "events_per_s_node": per_node.ravel(),
+            "hs23_required": required.ravel(),
+            "nodes_required": nodes.ravel(),
+        },
+        index=index,
+    )
+    if budget is not None:
+        result["headroom"] = 1 - result["hs23_required"] / budget
+    return result.dropna(subset=["hs23_s"]).reset_index()
@@ -0,0 +1,434 @@
+#!/usr/bin/env python3
+
+"""
+Self-contained HTML dashboard of stitched SPOT time series.
+
+All numeric columns are embedded as base64 encoded little-endian binary
+columns. For every zoom level the min/max of each bucket of nightlies is
+precomputed, so the browser only ever draws about two points per pixel and
+years of nightlies pan and zoom instantly without a server.
+"""
+
+import argparse
+import base64
+import json
+from pathlib import Path
+
+import numpy as np
+
+from spot import (
+    COMPONENTS,
+    DEFAULT_CATEGORIES,
+    LABELS,
+    REFERENCE_HS23,
+    category_label,
+    load,
+    parse_category,
+)
+
+
+# matplotlib's default colour cycle
+COLORS = [
+    "#1f77b4",
+    "#ff7f0e",
+    "#2ca02c",
+    "#d62728",
+    "#9467bd",
+    "#8c564b",
+    "#e377c2",
+    "#7f7f7f",
+    "#bcbd22",
+    "#17becf",
+]
+MEMORY_PREFIX = "avg_mem_"
+
+
+def min_max_levels(values, max_points=1):
+    """
+    Min/max downsampling of all columns at once for bucket sizes 2, 4, 8, ...
+    until a single bucket covers the series. Every bucket keeps the entries of
+    its smallest and largest value in time order, which preserves the spikes
+    that averaging or decimation would hide. NaNs are skipped.
+
+    Parameters:
+    values (array): Series with shape (entry, column).
+    max_points (int): Stop once the series has at most this many buckets.
+
+    Returns:
+    list of (int, array): Bucket size and entry indices with shape
+    (bucket, 2, column) per level.
+    """
+    values = np.asarray(values, dtype=float)
+    n, n_columns = values.shape
+    levels = []
+    width = 2
+    while -(-n // width) * 2 > max_points and width < 2 * n:
+        n_buckets = -(-n // width)
+        padded = np.full((n_buckets * width, n_columns), np.nan)
+        padded[:n] = values
+        blocks = padded.reshape(n_buckets, width, n_columns)
+        missing = np.isnan(blocks)
+        lowest = np.where(missing, np.inf, blocks).argmin(axis=1)
+        highest = np.where(missing, -np.inf, blocks).argmax(axis=1)
+        index = np.sort(np.stack([lowest, highest], axis=1), axis=1)
+        index += (np.arange(n_buckets) * width)[:, None, None]
+        levels.append((width, np.minimum(index, n - 1).astype(np.uint32)))
+        width *= 2
+    return levels
+
+
+def encode(array, dtype):
+    return base64.b64encode(np.ascontiguousarray(array, dtype=dtype).tobytes()).decode()
+
+
+def dashboard_columns(df, components=COMPONENTS, labels=LABELS):
+    """
+    Panels of the dashboard as (title, unit, [(column, label)]): the algorithm
+    times with their total, the memory and every workload column on its own.
+    """
+    numeric = list(df.select_dtypes("number").columns)
+    names = dict(zip(components, labels))
+    times = [c for c in numeric if c.startswith("Acts")]
+    memory = [c for c in numeric if c.startswith(MEMORY_PREFIX)]
+    workload = [c for c in numeric if c not in times + memory and c != "num_events"]
+    return [
+        (
+            "Reconstruction time",
+            "HS23 × s",
+            [(c, names.get(c, c)) for c in times] + [("Total", "Total")],
+        ),
+        (
+            "Memory",
+            "kB",
+            [(c, names.get(c.removeprefix(MEMORY_PREFIX), c)) for c in memory],
+        ),
+    ] + [(c, "", [(c, c)]) for c in workload]
+
+
+def dashboard_data(df, components=COMPONENTS, labels=LABELS, hs23=REFERENCE_HS23):
+    """
+    The payload of the dashboard: build dates, all columns and their min/max
+    levels as binary columns plus the panel layout.
+    """
+    df = df.reset_index(drop=True).sort_values("build_date")
+    panels = dashboard_columns(df, components, labels)
+    columns = [column for _, _, series in panels for column, _ in series]
+
+    table = df.assign(Total=df[components].sum(axis=1))
+    table = table.astype({c: float for c in table.columns if c in columns})
+    times = [column for column, _ in panels[0][2]]
+    table[times] = table[times] * hs23
+    # algorithms which did not run are gaps, not zeros
+    table[times] = table[times].where(table[times] > 0)
+    values = table[columns].to_numpy(dtype=float)
+
+    dates = (
+        df["build_date"].to_numpy().astype("datetime64[ms]").astype(np.int64)
+    ).astype(np.float64)
+    return {
+        "dates": encode(dates, "<f8"),
+        "count": len(df),
+        "columns": columns,
+        "values": encode(values.T, "<f4"),
+        "levels": [
+            {"width": width, "index": encode(index, "<u4")}
+            for width, index in min_max_levels(values)
+        ],
+        "panels": [
+            {
+                "title": title,
+                "unit": unit,
+                "series": [
+                    {"column": columns.index(column), "label": label}
+                    for column, label in series
+                ],
+            }
+            for title, unit, series in panels
+        ],
+        "sources": sorted({category_label(s) for s in df.get("source", [])}),
+        "colors": COLORS,
+    }
+
+
+def export(df, path, title="SPOT reconstruction time", **kwargs):
+    """
+    Write the dashboard of the stitched SPOT results `df` to `path`.
+    """
+    payload = json.dumps(dashboard_data(df, **kwargs), separators=(",", ":"))
+    html = TEMPLATE.replace("__TITLE__", title).replace(
+        "__DATA__", payload.replace("</", "<\\/")
+    )
+    Path(path).write_text(html, encoding="utf-8")
+
+
+TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>__TITLE__</title>
+<style>
+body { font-family: Helvetica, Arial, sans-serif; margin: 1em 2em; color: #222; }
+h1 { font-size: 1.3em; }
+.controls button { margin-right: 0.3em; }
+.panel { margin-top: 1em; }
+.panel h2 { font-size: 1em; margin: 0.2em 0; }
+.legend label { margin-right: 1em; font-size: 0.85em; cursor: pointer; }
+.legend span { display: inline-block; width: 1em; height: 0.25em;
+  vertical-align: middle; margin-right: 0.3em; }
+canvas { width: 100%; height: 260px; border: 1px solid #ddd; cursor: grab; }
+#info { color: #777; font-size: 0.8em; }
+</style>
+</head>
+<body>
+<h1>__TITLE__</h1>
+<div class="controls">
+  <button data-days="7">Week</button><button data-days="31">Month</button>
+  <button data-days="92">Quarter</button><button data-days="365">Year</button>
+  <button data-days="0">All</button>
+  <span id="info"></span>
+</div>
+<div id="panels"></div>
+<script id="data" type="application/json">__DATA__</script>
+<script>
+"use strict";
+const data = JSON.parse(document.getElementById("data").textContent);
+
+function decode(text, Type) {
+  const bytes = Uint8Array.from(atob(text), (c) => c.charCodeAt(0));
+  return new Type(bytes.buffer);
+}
+
+const n = data.count;
+const dates = decode(data.dates, Float64Array);
+const values = decode(data.values, Float32Array);
+const nColumns = data.columns.length;
+const levels = data.levels.map((l) => ({ width: l.width, index: decode(l.index, Uint32Array) }));
+const full = { x0: dates[0], x1: dates[n - 1] };
+let view = { ...full };
+const margin = { left: 70, right: 10, top: 10, bottom: 25 };
+
+function lowerBound(x) {
+  let lo = 0, hi = n;
+  while (lo < hi) {
+    const mid = (lo + hi) >> 1;
+    if (dates[mid] < x) lo = mid + 1; else hi = mid;
+  }
+  return lo;
+}
+
+// entries to draw for one column: every entry when zoomed in, else the
+// min/max of the finest level with at most one bucket per two pixels
+function visible(column, i0, i1, pixels) {
+  const count = i1 - i0;
+  const result = [];
+  const level = levels.find((l) => count / l.width <= pixels / 2);
+  if (count <= pixels || level === undefined) {
+    for (let i = i0; i < i1; i++) result.push(i);
+    return result;
+  }
+  const b0 = Math.floor(i0 / level.width), b1 = Math.ceil(i1 / level.width);
+  for (let b = b0; b < b1; b++) {
+    for (let j = 0; j < 2; j++) result.push(level.index[(b * 2 + j) * nColumns + column]);
+  }
+  return result;
+}
+
+function niceTicks(lo, hi, count) {
+  const step0 = (hi - lo) / count;
+  const power = Math.pow(10, Math.floor(Math.log10(step0)));
+  const step = [1, 2, 5, 10].map((m) => m * power).find((s) => s >= step0);
+  const ticks = [];
+  for (let t = Math.ceil(lo / step) * step; t <= hi; t += step) ticks.push(t);
+  return ticks;
+}
+
+function formatValue(v) {
+  const a = Math.abs(v);
+  if (a >= 1e5 || (a > 0 && a < 1e-2)) return v.toExponential(1);
+  return +v.toPrecision(4) + "";
+}
+
+const panels = data.panels.map((panel, p) => {
+  const div = document.createElement("div");
+  div.className = "panel";
+  const title = panel.unit ? `${panel.title} [${panel.unit}]` : panel.title;
+  div.innerHTML = `<h2>${title}</h2><div class="legend"></div><canvas></canvas>`;
+  document.getElementById("panels").appendChild(div);
+  const legend = div.querySelector(".legend");
+  const series = panel.series.map((s, i) => {
+    const color = s.label === "Total" ? "#000" : data.colors[i % data.colors.length];
+    const label = document.createElement("label");
+    label.innerHTML = `<input type="checkbox" checked><span style="background:${color}"></span>${s.label}`;
+    legend.appendChild(label);
+    const entry = { ...s, color, enabled: true };
+    label.querySelector("input").addEventListener("change", (e) => {
+      entry.enabled = e.target.checked;
+      draw();
+    });
+    return entry;
+  });
+  return { canvas: div.querySelector("canvas"), series };
+});
+
+function drawPanel(panel) {
+  const canvas = panel.canvas;
+  const ratio = window.devicePixelRatio || 1;
+  const width = canvas.clientWidth, height = canvas.clientHeight;
+  canvas.width = width * ratio;
+  canvas.height = height * ratio;
+  const ctx = canvas.getContext("2d");
+  ctx.scale(ratio, ratio);
+  ctx.clearRect(0, 0, width, height);
+
+  const plotWidth = width - margin.left - margin.right;
+  const plotHeight = height - margin.top - margin.bottom;
+  const i0 = Math.max(lowerBound(view.x0) - 1, 0);
+  const i1 = Math.min(lowerBound(view.x1) + 1, n);
+
+  const points = panel.series
+    .filter((s) => s.enabled)
+    .map((s) => [s, visible(s.column, i0, i1, plotWidth)]);
+  let y0 = Infinity, y1 = -Infinity;
+  for (const [s, index] of points) {
+    for (const i of index) {
+      const v = values[s.column * n + i];
+      if (dates[i] < view.x0 || dates[i] > view.x1 || !Number.isFinite(v)) continue;
+      if (v < y0) y0 = v;
+      if (v > y1) y1 = v;
+    }
+  }
+  if (!Number.isFinite(y0)) { y0 = 0; y1 = 1; }
+  if (y0 > 0 && y0 < 0.5 * y1) y0 = 0;
+  const pad = 0.05 * (y1 - y0 || Math.abs(y1) || 1);
+  y0 -= y0 === 0 ? 0 : pad;
+  y1 += pad;
+
+  const px = (x) => margin.left + ((x - view.x0) / (view.x1 - view.x0)) * plotWidth;
+  const py = (y) => margin.top + (1 - (y - y0) / (y1 - y0)) * plotHeight;
+
+  ctx.font = "11px Helvetica, Arial, sans-serif";
+  ctx.strokeStyle = "#ddd";
+  ctx.fillStyle = "#444";
+  ctx.textAlign = "right";
+  ctx.textBaseline = "middle";
+  for (const t of niceTicks(y0, y1, 5)) {
+    ctx.beginPath();
+    ctx.moveTo(margin.left, py(t));
+    ctx.lineTo(width - margin.right, py(t));
+    ctx.stroke();
+    ctx.fillText(formatValue(t), margin.left - 5, py(t));
+  }
+  ctx.textAlign = "center";
+  ctx.textBaseline = "top";
+  const day = 864e5;
+  const span = (view.x1 - view.x0) / day;
+  const stepDays = [1, 2, 7, 14, 31, 92, 183, 365].find((d) => span / d <= 8) || 730;
+  for (let t = Math.ceil(view.x0 / (stepDays * day)) * stepDays * day; t <= view.x1; t += stepDays * day) {
+    ctx.beginPath();
+    ctx.moveTo(px(t), margin.top);
+    ctx.lineTo(px(t), height - margin.bottom);
+    ctx.stroke();
+    ctx.fillText(new Date(t).toISOString().slice(0, 10), px(t), height - margin.bottom + 5);
+  }
+
+  ctx.save();
+  ctx.beginPath();
+  ctx.rect(margin.left, margin.top, plotWidth, plotHeight);
+  ctx.clip();
+  for (const [s, index] of points) {
+    ctx.strokeStyle = s.color;
+    ctx.lineWidth = s.label === "Total" ? 1.5 : 1;
+    ctx.beginPath();
+    let drawing = false;
+    for (const i of index) {
+      const v = values[s.column * n + i];
+      if (!Number.isFinite(v)) { drawing = false; continue; }
+      if (drawing) ctx.lineTo(px(dates[i]), py(v));
+      else ctx.moveTo(px(dates[i]), py(v));
+      drawing = true;
+    }
+    ctx.stroke();
+  }
+  ctx.restore();
+  ctx.strokeStyle = "#888";
+  ctx.strokeRect(margin.left, margin.top, plotWidth, plotHeight);
+}
+
+function draw() {
+  const start = performance.now();
+  panels.forEach(drawPanel);
+  const i0 = lowerBound(view.x0), i1 = lowerBound(view.x1 + 1);
+  document.getElementById("info").textContent =
+    `${i1 - i0} of ${n} nightlies, drawn in ${(performance.now() - start).toFixed(1)} ms` +
+    (data.sources.length ? `, categories: ${data.sources.join(", ")}` : "");
+}
+
+function setView(x0, x1) {
+  const span = Math.min(Math.max(x1 - x0, 864e5), full.x1 - full.x0 || 864e5);
+  x0 = Math.min(Math.max(x0, full.x0), full.x1 - span);
+  view = { x0, x1: x0 + span };
+  draw();
+}
+
+for (const { canvas } of panels) {
+  canvas.addEventListener("wheel", (e) => {
+    e.preventDefault();
+    const rect = canvas.getBoundingClientRect();
+    const f = (e.clientX - rect.left - margin.left) / (rect.width - margin.left - margin.right);
+    const at = view.x0 + f * (view.x1 - view.x0);
+    const scale = Math.exp(e.deltaY * 0.002);
+    setView(at - (at - view.x0) * scale, at + (view.x1 - at) * scale);
+  }, { passive: false });
+  canvas.addEventListener("pointerdown", (e) => {
+    const startX = e.clientX, startView = { ...view };
+    const rect = canvas.getBoundingClientRect();
+    const perPixel = (view.x1 - view.x0) / (rect.width - margin.left - margin.right);
+    const move = (m) => {
+      const shift = (startX - m.clientX) * perPixel;
+      setView(startView.x0 + shift, startView.x1 + shift);
+    };
+    const up = () => {
+      window.removeEventListener("pointermove", move);
+      window.removeEventListener("pointerup", up);
+    };
+    window.addEventListener("pointermove", move);
+    window.addEventListener("pointerup", up);
+  });
+  canvas.addEventListener("dblclick", () => setView(full.x0, full.x1));
+}
+
+for (const button of document.querySelectorAll("button[data-days]")) {
+  button.addEventListener("click", () => {
+    const days = +button.dataset.days;
+    if (days === 0) setView(full.x0, full.x1);
+    else setView(full.x1 - days * 864e5, full.x1);
+  });
+}
+
+window.addEventListener("resize", draw);
+draw();
+</script>
+</body>
+</html>
+"""
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "input_folder", type=Path, help="Path to input folder containing CSV files"
+    )
+    parser.add_argument("output", type=Path, help="Path to output HTML file")
+    parser.add_argument(
+        "--category",
+        action="append",
+        help="SPOT category as `name[,start[,end]]`, repeat in order of priority",
+    )
+    args = parser.parse_args()
+
+    categories = (
+        [parse_category(spec) for spec in args.category]
+        if args.category
+        else DEFAULT_CATEGORIES
+    )
+    export(load(args.input_folder, categories), args.output)
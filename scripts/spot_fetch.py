@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+
+# /// script
+# requires-python = ">=3.11"
+# dependencies = [
+#  "numpy",
+#  "pandas",
+#  "requests"
+# ]
+# ///
+
+import argparse
+import io
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from spot import DEFAULT_CATEGORIES, category_path, read_category, read_results
+
+
+def meta_path(path):
+    return path.with_name(path.name + ".meta.json")
+
+
+def create_session(workers):
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=workers)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def fetch_category(session, base_url, category, output_folder, timeout=30):
+    """
+    Fetch the results of one SPOT category into `output_folder`.
+
+    The request is conditional on the ETag and Last-Modified of the cached copy,
+    so an unchanged category costs a single round-trip without a body.
+
+    Returns:
+    (pd.DataFrame, bool): The ingested results and whether they were downloaded.
+    """
+    path = category_path(output_folder, category)
+    url = f"{base_url.rstrip('/')}/{path.name}"
+
+    headers = {}
+    if path.exists() and meta_path(path).exists():
+        meta = json.loads(meta_path(path).read_text())
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+
+    response = session.get(url, headers=headers, timeout=timeout)
+    if response.status_code == 304:
+        return read_category(output_folder, category), False
+    response.raise_for_status()
+
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_bytes(response.content)
+    os.replace(tmp_path, path)
+    meta = {
+        "url": url,
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+    }
+    meta_path(path).write_text(json.dumps(meta, indent=2) + "\n")
+
+    return read_results(io.BytesIO(response.content)), True
+
+
+def fetch(base_url, categories, output_folder, workers=8, timeout=30, strict=True):
+    """
+    Fetch several SPOT categories concurrently over one pooled session.
+
+    Without `strict`, categories which cannot be fetched are left out of the
+    result, so `spot.load` falls back to its input folder for them.
+
+    Returns:
+    dict: Category name to ingested results, ready for `spot.load`.
+    """
+    output_folder = Path(output_folder)
+    output_folder.mkdir(parents=True, exist_ok=True)
+
+    with create_session(workers) as session:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                category: executor.submit(
+                    fetch_category, session, base_url, category, output_folder, timeout
+                )
+                for category in categories
+            }
+            results = {}
+            for category, future in futures.items():
+                try:
+                    results[category] = future.result()
+                except requests.RequestException as e:
+                    if strict:
+                        raise
+                    print("failed", category, e)
+
+    for category, (_, downloaded) in results.items():
+        print("fetched" if downloaded else "unchanged", category)
+
+    return {category: df for category, (df, _) in results.items()}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("url", help="Base URL of the SPOT results")
+    parser.add_argument(
+        "output_folder", type=Path, help="Path to folder to store the CSV files in"
+    )
+    parser.add_argument(
+        "--category",
+        action="append",
+        help="SPOT category to fetch, repeat for several",
+    )
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--timeout", type=float, default=30)
+    args = parser.parse_args()
+
+    categories = args.category or [name for name, _, _ in DEFAULT_CATEGORIES]
+    fetch(args.url, categories, args.output_folder, args.workers, args.timeout)
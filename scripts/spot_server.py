@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+
+"""
+Local stand-in for the SPOT results service.
+
+Serves the `cern_results_*.csv` files of a folder with ETag and Last-Modified
+headers and answers conditional requests with 304, like the real service.
+"""
+
+import argparse
+import hashlib
+import threading
+from email.utils import formatdate, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+
+class SpotHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        name = self.path.lstrip("/").split("?")[0]
+        path = self.server.folder / name
+        if (
+            "/" in name
+            or not name.startswith("cern_results_")
+            or not name.endswith(".csv")
+            or not path.is_file()
+        ):
+            self.send_error(404)
+            return
+
+        content, etag, mtime = self.server.load(path)
+        last_modified = formatdate(mtime, usegmt=True)
+
+        if self.not_modified(etag, mtime):
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Last-Modified", last_modified)
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/csv")
+        self.send_header("Content-Length", str(len(content)))
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", last_modified)
+        self.end_headers()
+        self.wfile.write(content)
+
+    def not_modified(self, etag, mtime):
+        if_none_match = self.headers.get("If-None-Match")
+        if if_none_match is not None:
+            return etag in [tag.strip() for tag in if_none_match.split(",")]
+        if_modified_since = self.headers.get("If-Modified-Since")
+        if if_modified_since is not None:
+            try:
+                since = parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+            return int(mtime) <= since
+        return False
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class SpotServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, folder, verbose=False):
+        super().__init__(address, SpotHandler)
+        self.folder = Path(folder)
+        self.verbose = verbose
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def load(self, path):
+        stat = path.stat()
+        key = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            cached = self._cache.get(path)
+        if cached is None or cached[0] != key:
+            content = path.read_bytes()
+            etag = '"' + hashlib.sha1(content).hexdigest() + '"'
+            cached = (key, content, etag)
+            with self._lock:
+                self._cache[path] = cached
+        _, content, etag = cached
+        return content, etag, stat.st_mtime
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+def serve(folder, host="127.0.0.1", port=0, verbose=False):
+    """
+    Start a stand-in server in a background thread.
+
+    Returns the running server, call `shutdown()` on it when done.
+    """
+    server = SpotServer((host, port), folder, verbose)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "folder", type=Path, help="Path to folder containing the CSV files to serve"
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+
+    server = SpotServer((args.host, args.port), args.folder, verbose=True)
+    print("serving", args.folder, "at", server.url)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    server.server_close()
@@ -0,0 +1,483 @@
+#!/usr/bin/env python3
+
+import argparse
+import struct
+from pathlib import Path
+import numpy as np
+import pandas as pd
+import scipy.special
+import uproot
+from uproot.const import kByteCountMask, kNewClassTag
+from uproot.serialization import numbytes_version, serialize_object_any, string
+from uproot.writing.identify import to_TAxis, to_TH1x, to_TH2x, to_TProfile
+
+from spot import CATEGORY_PREFIX, category_path
+
+
+# sizes at scale 1, roughly ten times the inputs in `data/`
+N_EVENTS = 12_000
+N_NIGHTLIES = 900
+N_HISTOGRAMS = 500
+
+TRACKS = "InDetTrackPerfMonPlots/TrkAnaEF_EFsel/Offline/Tracks"
+IDTPM_FILES = {
+    "IDTPM.C000.ttbar_pu200_EFsel.HIST.root": 1.0,
+    "IDTPM_TTBAR_Acts_C100_digital_Main30July2025.root": 1.02,
+    "IDTPM_TTBAR_Acts_C100DEFAULT_digital.root": 0.99,
+}
+# algorithm directories of the monitoring file and (offset, slope, clusters)
+MONITORING = {
+    "ActsPixelClusterizationAlg": (10.8, 4.0e-4, 243_600),
+    "ActsStripClusterizationAlg": (22.9, 2.2e-4, 230_900),
+    "ITkPixelClusterization": (122.7, 8.0e-4, 243_600),
+    "ITkStripClusterization": (30.0, 6.0e-4, 230_900),
+}
+# thread counts of the AthenaMT scan and (sigma, kappa) of every algorithm
+THREAD_COUNTS = [1, 2, 4, 8, 16, 24, 32, 48, 64]
+SCALING = {
+    "ActsPixelClusterizationAlg": (0.004, 2e-4),
+    "ActsStripClusterizationAlg": (0.003, 1e-4),
+    "ActsPixelSeedingAlg": (0.01, 5e-5),
+    "ActsTrackFindingAlg": (0.02, 1e-5),
+    "ActsAmbiguityResolutionAlg": (0.001, 0),
+}
+# category and per event time at the start of the series
+SPOT_CATEGORIES = {"actstracking": 20.0, "actsfasttracking": 3.0}
+SPOT_LAST_NIGHTLY = "2025-10-06"
+SPOT_ALGORITHMS = [
+    "ActsTrackFindingAlg",
+    "ActsPixelSeedingAlg",
+    "ActsStripSeedingAlg",
+    "ActsPixelClusterizationAlg",
+    "ActsStripClusterizationAlg",
+    "ActsStripSpacePointFormationAlg",
+    "ActsPixelSpacePointFormationAlg",
+    "ActsAmbiguityResolutionAlg",
+]
+
+
+def axis(edges, name="xaxis"):
+    edges = np.asarray(edges, dtype=np.float64)
+    uniform = np.allclose(np.diff(edges), edges[1] - edges[0])
+    return to_TAxis(
+        name, "", len(edges) - 1, edges[0], edges[-1], None if uniform else edges
+    )
+
+
+def th1(name, edges, values, errors):
+    """
+    TH1D with explicit bin errors, e.g. an efficiency or a resolution.
+    """
+    x = 0.5 * (edges[1:] + edges[:-1])
+    flow = np.zeros(len(values) + 2)
+    data, sumw2 = flow.copy(), flow.copy()
+    data[1:-1], sumw2[1:-1] = values, errors**2
+    return to_TH1x(
+        name,
+        name,
+        data,
+        values.sum(),
+        values.sum(),
+        sumw2.sum(),
+        (values * x).sum(),
+        (values * x**2).sum(),
+        sumw2,
+        axis(edges),
+    )
+
+
+def th2(name, xedges, yedges, counts):
+    """
+    TH2D from counts of shape (x, y) without under- and overflow.
+    """
+    x = 0.5 * (xedges[1:] + xedges[:-1])
+    y = 0.5 * (yedges[1:] + yedges[:-1])
+    data = np.zeros((len(yedges) + 1, len(xedges) + 1))
+    data[1:-1, 1:-1] = counts.T
+    data = data.ravel()
+    n = counts.sum()
+    return to_TH2x(
+        name,
+        name,
+        data,
+        n,
+        n,
+        n,
+        (counts.sum(axis=1) * x).sum(),
+        (counts.sum(axis=1) * x**2).sum(),
+        (counts.sum(axis=0) * y).sum(),
+        (counts.sum(axis=0) * y**2).sum(),
+        (counts * np.outer(x, y)).sum(),
+        data,
+        axis(xedges),
+        axis(yedges, "yaxis"),
+    )
+
+
+def tprofile(name, edges, entries, sum_y, sum_y2):
+    x = 0.5 * (edges[1:] + edges[:-1])
+
+    def flow(values):
+        return np.concatenate([[0], values, [0]]).astype(np.float64)
+
+    n = entries.sum()
+    return to_TProfile(
+        name,
+        name,
+        flow(sum_y),
+        n,
+        n,
+        n,
+        (entries * x).sum(),
+        (entries * x**2).sum(),
+        sum_y.sum(),
+        sum_y2.sum(),
+        flow(sum_y2),
+        flow(entries),
+        np.array([], dtype=np.float64),
+        axis(edges),
+    )
+
+
+def _versioned(version, *parts):
+    body = b"".join(parts)
+    return numbytes_version(len(body), version) + body
+
+
+def _object_any(classname, data):
+    classname = classname.encode() + b"\x00"
+    count = (len(classname) + len(data) + 4) | kByteCountMask
+    return struct.pack(">II", count, kNewClassTag) + classname + data
+
+
+def _tnamed(name, title, bits=0x03000000):
+    return _versioned(1, struct.pack(">hII", 1, 0, bits), string(name), string(title))
+
+
+def _streamer_element(classname, version, name, title, ftype, size, typename, *extra):
+    # TStreamerElement v4: type, size, array length and dimension, max indices
+    element = _versioned(
+        4,
+        _tnamed(name, title),
+        struct.pack(">iiii5i", ftype, size, 0, 0, 0, 0, 0, 0, 0),
+        string(typename),
+    )
+    return _object_any(classname, _versioned(version, element, *extra))
+
+
+# TEfficiency v2 with its streamer, uproot reads the class but cannot write it
+TEFFICIENCY_MEMBERS = [
+    ("TStreamerBase", "TNamed", 67, 0, "BASE", 1),
+    ("TStreamerBase", "TAttLine", 0, 0, "BASE", 2),
+    ("TStreamerBase", "TAttFill", 0, 0, "BASE", 2),
+    ("TStreamerBase", "TAttMarker", 0, 0, "BASE", 2),
+    ("TStreamerBasicType", "fBeta_alpha", 8, 8, "double"),
+    ("TStreamerBasicType", "fBeta_beta", 8, 8, "double"),
+    ("TStreamerSTL", "fBeta_bin_params", 300, 24, "vector<pair<double,double> >"),
+    ("TStreamerBasicType", "fConfLevel", 8, 8, "double"),
+    ("TStreamerObjectPointer", "fFunctions", 63, 8, "TList*"),
+    ("TStreamerObjectPointer", "fPassedHistogram", 64, 8, "TH1*"),
+    ("TStreamerBasicType", "fStatisticOption", 3, 4, "TEfficiency::EStatOption"),
+    ("TStreamerObjectPointer", "fTotalHistogram", 64, 8, "TH1*"),
+    ("TStreamerBasicType", "fWeight", 8, 8, "double"),
+]
+
+
+def _tefficiency_streamer():
+    elements = []
+    for classname, name, ftype, size, typename, *base_version in TEFFICIENCY_MEMBERS:
+        if classname == "TStreamerBase":
+            extra, version = struct.pack(">i", *base_version), 3
+        elif classname == "TStreamerSTL":
+            # std::vector of objects
+            extra, version = struct.pack(">ii", 1, 61), 3
+        else:
+            extra, version = b"", 2
+        elements.append(
+            _streamer_element(
+                classname, version, name, "", ftype, size, typename, extra
+            )
+        )
+    array = _versioned(
+        3,
+        struct.pack(">hII", 1, 0, 0x02000000),
+        string(""),
+        struct.pack(">ii", len(elements), 0),
+        *elements,
+    )
+    info = _versioned(
+        9,
+        _tnamed("TEfficiency", ""),
+        struct.pack(">Ii", 0, 2),
+        _object_any("TObjArray", array),
+    )
+    # followed by the empty option of its entry in the list of streamers
+    return (None, _object_any("TStreamerInfo", info) + b"\x00", "TEfficiency", 2)
+
+
+class TEfficiency(uproot.model.Model):
+    """
+    Writable TEfficiency of a passed and a total TH1D, by default with the
+    options of ROOT: 68.3% Clopper-Pearson intervals without weights.
+    """
+
+    classname = "TEfficiency"
+
+    def __init__(
+        self, name, passed, total, statistic_option=0, conf_level=0.682689492137
+    ):
+        self.name, self.passed, self.total = name, passed, total
+        self.statistic_option, self.conf_level = statistic_option, conf_level
+
+    @property
+    def fTitle(self):
+        return self.name
+
+    @property
+    def class_rawstreamers(self):
+        return (*self.total.class_rawstreamers, _tefficiency_streamer())
+
+    def to_writable(self):
+        return self
+
+    def serialize(self, name=None):
+        return _versioned(
+            2,
+            _tnamed(name or self.name, self.name),
+            _versioned(2, struct.pack(">hhh", 1, 1, 1)),
+            _versioned(2, struct.pack(">hh", 0, 1001)),
+            _versioned(2, struct.pack(">hhf", 1, 1, 1)),
+            struct.pack(">dd", 1, 1),
+            # empty std::vector
+            _versioned(6, struct.pack(">i", 0)),
+            struct.pack(">d", self.conf_level),
+            # empty TList
+            _versioned(5, struct.pack(">hII", 1, 0, 0x03000000), string(""), b"\0" * 4),
+            serialize_object_any(self.passed),
+            struct.pack(">i", self.statistic_option),
+            serialize_object_any(self.total),
+            struct.pack(">d", 1),
+        )
+
+
+def idtpm_objects(rng, quality=1.0, bins=80, n_tracks=200_000):
+    """
+    The IDTPM histograms read by the tracking plots.
+    """
+    eta_edges = np.linspace(-4, 4, bins + 1)
+    eta = 0.5 * (eta_edges[1:] + eta_edges[:-1])
+    pt_edges = np.geomspace(1, 100, 21)
+    pt = np.sqrt(pt_edges[1:] * pt_edges[:-1])
+    n_eta = rng.poisson(n_tracks / bins, size=bins).astype(float)
+
+    objects = {}
+    for name, plateau in [("", 0.94), ("Technical/", 0.97)]:
+        eff = np.clip(plateau * quality - 0.02 * np.abs(eta) ** 1.5, 0, 1)
+        passed = rng.binomial(n_eta.astype(int), eff).astype(float)
+        objects[f"Efficiencies/{name}eff_vs_truth_eta"] = TEfficiency(
+            "eff_vs_truth_eta",
+            th1("eff_vs_truth_eta_passed", eta_edges, passed, np.sqrt(passed)),
+            th1("eff_vs_truth_eta_total", eta_edges, n_eta, np.sqrt(n_eta)),
+        )
+
+    for name, mean in [
+        ("offl_nInnerMostPixelHits_vs_offl_eta", 1 + 0.1 * np.abs(eta)),
+        ("offl_nPixelHits_vs_offl_eta", 9 + 1.5 * np.abs(eta)),
+        ("offl_nSCTHits_vs_offl_eta", np.clip(16 - 4 * np.abs(eta), 0, None)),
+    ]:
+        sum_y = rng.normal(mean * n_eta, np.sqrt(mean * n_eta))
+        sum_y2 = sum_y**2 / n_eta + mean * n_eta
+        objects[f"HitsOnTracks/{name}"] = tprofile(
+            name, eta_edges, n_eta, sum_y, sum_y2
+        )
+
+    residual_edges = np.linspace(-1, 1, 201)
+    # resolutions in μm for d0 and z0, residuals in mm
+    for mode, scale in [("d0", 1e-3), ("z0", 1e-3), ("ptqopt", 1)]:
+        sigma = (0.03 + 0.01 * eta**2) / quality
+        objects[f"Resolutions/resolution_{mode}_vs_truth_eta"] = th1(
+            f"resolution_{mode}_vs_truth_eta",
+            eta_edges,
+            sigma / scale,
+            sigma / scale / np.sqrt(2 * n_eta),
+        )
+        for vs, centers, edges in [("eta", eta, eta_edges), ("pt", pt, pt_edges)]:
+            width = (
+                (0.03 + 0.01 * centers**2) if vs == "eta" else 0.02 + 0.2 / centers
+            )
+            width = width * 0.5 / quality
+            cdf = scipy.special.ndtr(residual_edges / width[:, np.newaxis])
+            expected = np.diff(cdf, axis=1) * (n_tracks / len(centers))
+            counts = rng.poisson(expected).astype(float)
+            objects[f"Resolutions/resHelper_{mode}_vs_truth_{vs}"] = th2(
+                f"resHelper_{mode}_vs_truth_{vs}", edges, residual_edges, counts
+            )
+
+    return {f"{TRACKS}/{key}": obj for key, obj in objects.items()}
+
+
+def write_idtpm(path, n_histograms=N_HISTOGRAMS, bins=80, quality=1.0, seed=0):
+    """
+    Write an IDTPM-structured file with the histograms of the tracking plots
+    and `n_histograms` filler histograms of the same binning.
+    """
+    rng = np.random.default_rng(seed)
+    edges = np.linspace(-4, 4, bins + 1)
+    with uproot.recreate(path) as file:
+        for key, obj in idtpm_objects(rng, quality, bins).items():
+            file[key] = obj
+        for i in range(n_histograms):
+            counts = rng.poisson(100, size=bins).astype(np.float64)
+            if i % 4 == 3:
+                file[f"{TRACKS}/Extra/h2_{i}"] = (
+                    rng.poisson(10, size=(bins, bins)).astype(np.float64),
+                    edges,
+                    edges,
+                )
+            else:
+                file[f"{TRACKS}/Extra/h_{i}"] = (counts, edges)
+
+
+def write_monitoring(path, n_events=N_EVENTS, seed=0, chunk_size=1_000_000):
+    """
+    Write `TimeVsClusters` trees of the clusterization monitoring, in chunks so
+    millions of events do not have to fit into memory at once. Entry `i` of
+    every tree is the same event: the algorithms of a detector see the same
+    number of clusters and all of them share the load of the machine.
+    """
+    rng = np.random.default_rng(seed)
+    with uproot.recreate(path) as file:
+        trees = {
+            algorithm: file.mktree(
+                f"{algorithm}/TimeVsClusters",
+                {"TIME_execute": np.int32, "NClustersCreated": np.int32},
+            )
+            for algorithm in MONITORING
+        }
+        for start in range(0, n_events, chunk_size):
+            n = min(chunk_size, n_events - start)
+            occupancy = {
+                clusters: rng.normal(clusters, 0.14 * clusters, size=n).clip(1)
+                for clusters in sorted({c for _, _, c in MONITORING.values()})
+            }
+            # heavy tail from busy machines
+            load = rng.lognormal(0, 0.1, size=n) * np.where(
+                rng.random(n) < 0.02, rng.uniform(1.5, 4, size=n), 1
+            )
+            for algorithm, (offset, slope, clusters) in MONITORING.items():
+                x = occupancy[clusters]
+                y = (offset + slope * x) * load * rng.lognormal(0, 0.03, size=n)
+                trees[algorithm].extend(
+                    {
+                        "TIME_execute": np.round(y).astype(np.int32),
+                        "NClustersCreated": np.round(x).astype(np.int32),
+                    }
+                )
+
+
+def spot_results(category, n_nightlies, time_scale, rng):
+    dates = pd.date_range(
+        end=SPOT_LAST_NIGHTLY, periods=n_nightlies, freq="D"
+    ) + pd.Timedelta(hours=21, minutes=1)
+    trend = np.linspace(1, 0.4, n_nightlies)
+    steps = np.cumprod(np.where(rng.random(n_nightlies) < 0.01, 0.9, 1))
+    df = pd.DataFrame(
+        {
+            "name": [
+                f"{d:%d-%m-%Y}-main-x86_64-el9-gcc13-opt-phase2_recoonly_{category}-RAWtoALL"
+                for d in dates
+            ],
+            "category": f"{CATEGORY_PREFIX}{category}",
+            "build_date": dates.strftime("%Y-%m-%d %H:%M:%S"),
+            "num_events": 100.0,
+        }
+    )
+    for i, algorithm in enumerate(SPOT_ALGORITHMS):
+        base = time_scale / (1 + i)
+        df[algorithm] = base * trend * steps * rng.lognormal(0, 0.02, n_nightlies)
+    for algorithm in SPOT_ALGORITHMS:
+        df[f"avg_mem_{algorithm}"] = rng.normal(50_000, 500, n_nightlies)
+    df["ckf_tracks"] = rng.normal(1860, 5, n_nightlies)
+    df["selected_tracks"] = rng.normal(1790, 5, n_nightlies)
+    df["input_seeds"] = rng.normal(9830, 50, n_nightlies) * np.where(
+        dates >= pd.Timestamp("2025-07-22"), 0.7, 1
+    )
+    df["efficiency"] = rng.normal(0.86, 0.002, n_nightlies)
+    df["pixel_clusters"] = rng.normal(240_600, 100, n_nightlies)
+    df["strip_clusters"] = rng.normal(225_950, 100, n_nightlies)
+    return df
+
+
+def write_spot(folder, n_nightlies=N_NIGHTLIES, seed=0):
+    """
+    Write SPOT CSVs of `n_nightlies` consecutive nightlies per category.
+    """
+    rng = np.random.default_rng(seed)
+    for category, time_scale in SPOT_CATEGORIES.items():
+        df = spot_results(category, n_nightlies, time_scale, rng)
+        df.to_csv(category_path(folder, f"{CATEGORY_PREFIX}{category}"), index=False)
+
+
+def write_thread_scan(path, threads=THREAD_COUNTS, repeats=3, seed=0):
+    """
+    Write a SPOT-style CSV of an AthenaMT thread scan with `repeats` runs per
+    thread count. The algorithm times follow the Universal Scalability Law with
+    the parameters in `SCALING`.
+    """
+    rng = np.random.default_rng(seed)
+    n = np.repeat(np.asarray(threads, dtype=float), repeats)
+    df = pd.DataFrame(
+        {"threads": n.astype(int), "slots": n.astype(int), "num_events": 1000.0}
+    )
+    busy = 0
+    for i, (algorithm, (sigma, kappa)) in enumerate(SCALING.items()):
+        single = SPOT_CATEGORIES["actsfasttracking"] / (1 + i)
+        df[algorithm] = (
+            single
+            * (1 + sigma * (n - 1) + kappa * n * (n - 1))
+            * rng.lognormal(0, 0.02, len(n))
+        )
+        df[f"avg_mem_{algorithm}"] = rng.normal(50_000, 500, len(n))
+        busy = busy + df[algorithm]
+    # a serial fraction outside of the monitored algorithms
+    df["wall_time"] = df["num_events"] * (busy / n + 0.01 * busy)
+    df["rss_mb"] = 2000 + 450 * n + rng.normal(0, 20, len(n))
+    df.to_csv(path, index=False)
+
+
+def generate(output_folder, scale=1, bins=80, seed=0):
+    """
+    Write a complete synthetic input tree with the layout of `data/`.
+    """
+    output_folder = Path(output_folder)
+    for sub in ["clustering", "scaling", "spot", "tracking"]:
+        (output_folder / sub).mkdir(parents=True, exist_ok=True)
+
+    write_monitoring(
+        output_folder / "clustering" / "acts-expert-monitoring.root",
+        n_events=int(N_EVENTS * scale),
+        seed=seed,
+    )
+    write_spot(output_folder / "spot", n_nightlies=int(N_NIGHTLIES * scale), seed=seed)
+    write_thread_scan(output_folder / "scaling" / "thread_scan.csv", seed=seed)
+    for i, (name, quality) in enumerate(IDTPM_FILES.items()):
+        write_idtpm(
+            output_folder / "tracking" / name,
+            n_histograms=int(N_HISTOGRAMS * scale),
+            bins=bins,
+            quality=quality,
+            seed=seed + i,
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("output_folder", type=Path, help="Folder to write the data to")
+    parser.add_argument(
+        "--scale", type=float, default=1, help="Size relative to the scale 1 inputs"
+    )
+    parser.add_argument("--bins", type=int, default=80, help="Number of eta bins")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    generate(args.output_folder, args.scale, args.bins, args.seed)
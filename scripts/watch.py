@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+
+import argparse
+import functools
+import importlib
+import importlib.util
+import os
+import runpy
+import shlex
+import sys
+import time
+import traceback
+from pathlib import Path
+
+from incremental import local_modules
+
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+# readers whose results stay in memory between renders, keyed by path and mtime
+CACHED_READERS = [("common", "read_object", False), ("spot", "read_results", True)]
+
+
+class Target:
+    def __init__(self, command):
+        self.argv = shlex.split(command)
+        if self.argv[0] == "python":
+            self.argv = self.argv[1:]
+        self.script = Path(self.argv[0]).resolve()
+        self.modules = set(local_modules(self.script))
+        self.paths = [
+            Path(argument).resolve()
+            for argument in self.argv[1:]
+            if Path(argument).exists()
+        ]
+
+    def depends_on(self, path):
+        return path in self.modules or any(
+            path == p or p in path.parents for p in self.paths
+        )
+
+    def __str__(self):
+        return shlex.join(self.argv)
+
+
+def cached_reader(func, cache, copy):
+    @functools.wraps(func)
+    def wrapper(path, *args):
+        path = Path(path).resolve()
+        key = (func.__module__, func.__name__, path, path.stat().st_mtime_ns, args)
+        if key not in cache:
+            cache[key] = func(path, *args)
+        return cache[key].copy() if copy else cache[key]
+
+    wrapper.cached = True
+    return wrapper
+
+
+def prepare(cache):
+    """
+    Import the helper modules if they were dropped and route their readers
+    through the in-memory cache.
+    """
+    for module_name, name, copy in CACHED_READERS:
+        module = importlib.import_module(module_name)
+        func = getattr(module, name)
+        if not getattr(func, "cached", False):
+            setattr(module, name, cached_reader(func, cache, copy))
+
+    import figures
+
+    figures.warm()
+
+
+def drop_modules(path):
+    """
+    Remove a changed helper module and every loaded local module importing it
+    from `sys.modules`, so they are imported again on the next render.
+    """
+    for name, module in list(sys.modules.items()):
+        file = getattr(module, "__file__", None)
+        if file is None or Path(file).resolve().parent != SCRIPTS_DIR:
+            continue
+        if not Path(file).exists():
+            del sys.modules[name]
+            continue
+        if path in local_modules(file):
+            del sys.modules[name]
+
+
+def render(target):
+    import matplotlib.pyplot as plt
+
+    start = time.perf_counter()
+    argv = sys.argv
+    sys.argv = target.argv
+    status = "rendered"
+    try:
+        runpy.run_path(str(target.script), run_name="__main__")
+    except BaseException:
+        traceback.print_exc()
+        status = "failed"
+    finally:
+        sys.argv = argv
+        plt.close("all")
+    print(f"{status} in {time.perf_counter() - start:.2f}s: {target}", flush=True)
+
+
+def inotify_changes(folders, debounce):
+    """
+    Yield sets of changed files below `folders` using inotify.
+    """
+    from inotify_simple import INotify, flags
+
+    inotify = INotify()
+    mask = flags.CLOSE_WRITE | flags.MOVED_TO | flags.CREATE | flags.DELETE
+    watches = {}
+
+    def add(folder):
+        for root, dirs, _ in os.walk(folder):
+            dirs[:] = [d for d in dirs if not d.startswith((".", "__"))]
+            watches[inotify.add_watch(root, mask)] = Path(root).resolve()
+
+    for folder in folders:
+        add(folder)
+
+    while True:
+        changed = {watches[event.wd] / event.name for event in inotify.read()}
+        # editors save in several steps, gather them into one change
+        while events := inotify.read(timeout=int(debounce * 1000)):
+            changed.update(watches[event.wd] / event.name for event in events)
+        for path in changed:
+            if path.is_dir():
+                add(path)
+        yield changed
+
+
+def polling_changes(folders, interval):
+    """
+    Yield sets of changed files below `folders` by comparing modification
+    times, for systems without inotify.
+    """
+
+    def snapshot():
+        return {
+            path.resolve(): path.stat().st_mtime_ns
+            for folder in folders
+            for path in Path(folder).rglob("*")
+            if path.is_file()
+        }
+
+    before = snapshot()
+    while True:
+        time.sleep(interval)
+        after = snapshot()
+        changed = {
+            path
+            for path in before.keys() | after.keys()
+            if before.get(path) != after.get(path)
+        }
+        before = after
+        if changed:
+            yield changed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Keep inputs in memory and re-render plots when their data or "
+        "scripts change"
+    )
+    parser.add_argument(
+        "commands",
+        nargs="*",
+        help="Plot commands, e.g. 'scripts/plot_spot.py data/spot --output plots/spot.png'",
+    )
+    parser.add_argument(
+        "--targets", type=Path, help="File with one plot command per line"
+    )
+    parser.add_argument(
+        "--watch",
+        type=Path,
+        action="append",
+        help="Folder to watch, default `scripts` and `data`",
+    )
+    parser.add_argument("--debounce", type=float, default=0.05)
+    args = parser.parse_args()
+
+    import matplotlib
+
+    matplotlib.use("Agg")
+    sys.path.insert(0, str(SCRIPTS_DIR))
+
+    commands = list(args.commands)
+    if args.targets is not None:
+        commands += [
+            line.strip()
+            for line in args.targets.read_text().splitlines()
+            if line.strip() and not line.startswith("#")
+        ]
+    if len(commands) == 0:
+        parser.error("no plot commands given")
+    targets = [Target(command) for command in commands]
+    folders = args.watch or [Path("scripts"), Path("data")]
+
+    cache = {}
+    prepare(cache)
+    for target in targets:
+        render(target)
+
+    if importlib.util.find_spec("inotify_simple") is not None:
+        changes = inotify_changes(folders, args.debounce)
+    else:
+        print("inotify_simple not available, polling for changes")
+        changes = polling_changes(folders, args.debounce * 4)
+
+    for changed in changes:
+        changed = {path.resolve() for path in changed if path.suffix != ".pyc"}
+        for path in changed:
+            if path.suffix == ".py" and path.parent == SCRIPTS_DIR:
+                drop_modules(path)
+        stems = {path.stem for path in changed if path.suffix == ".py"}
+        for key in [key for key in cache if key[2] in changed or key[0] in stems]:
+            del cache[key]
+
+        for target in targets:
+            if target.script in changed:
+                target.modules = set(local_modules(target.script))
+        affected = [t for t in targets if any(t.depends_on(p) for p in changed)]
+        if affected:
+            prepare(cache)
+        for target in affected:
+            render(target)